@@ -65,6 +65,7 @@ apt upgrade -y
 echo "📦 Installing required packages..."
 apt install -y \
     mpv \
+    ffmpeg \
     python3 \
     python3-pip \
     python3-venv \
@@ -92,7 +93,7 @@ python3 -m venv "$INSTALL_DIR/venv"
 
 echo "📥 Installing Python dependencies..."
 "$INSTALL_DIR/venv/bin/pip" install --upgrade pip
-"$INSTALL_DIR/venv/bin/pip" install Flask==3.0.0 Werkzeug==3.0.1
+"$INSTALL_DIR/venv/bin/pip" install Flask==3.0.0 Werkzeug==3.0.1 Pillow==10.4.0
 
 # =============================================================================
 # Copy Application Files
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Cache Warmer - Pre-loads local media into the page cache before playback
+Avoids first-play stutter on SD-card backed Raspberry Pis. Warmed pages are
+not pinned: the page cache is global, so under memory pressure the kernel can
+still reclaim them; the budget bounds how much is read ahead.
+"""
+
+import mmap
+import os
+import threading
+
+
+# Warm-up strategies
+MODE_FADVISE = 'fadvise'    # Ask the kernel to read ahead asynchronously
+MODE_MMAP = 'mmap'          # Touch every page so the data is resident before mpv starts
+WARM_MODES = (MODE_FADVISE, MODE_MMAP)
+
+PAGE_SIZE = mmap.PAGESIZE
+
+# Seeks land on the keyframe before the target: warm a little ahead of a start position
+START_MARGIN_SECONDS = 5
+
+
+class CacheWarmer:
+    """
+    Warms the first seconds of each zone's active file within a shared memory budget
+
+    The budget is split evenly between zones so one zone's read-ahead is never
+    larger than the other's, and a zone switching files only advises the
+    kernel to drop its old file if the other zone isn't playing it. A file
+    played in both zones is read once and counted once.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024, zones=2, mode=MODE_FADVISE,
+                 seconds=30, duration_of=None):
+        """
+        Args:
+            budget_bytes: Page cache both zones may keep warm together
+            zones: Number of zones sharing the budget
+            mode: Default warm-up strategy
+            seconds: Length to warm from the start position, converted to
+                     bytes with the file's average bitrate
+            duration_of: Optional callable returning a file's duration in
+                         seconds (None if unknown); without a duration the
+                         head is warmed, limited by the zone budget only
+        """
+        self.budget_bytes = budget_bytes
+        self.zones = zones
+        self.mode = mode
+        self.seconds = seconds
+        self.duration_of = duration_of
+        self.lock = threading.Lock()
+
+        # zone_id -> {'path': ..., 'offset': ..., 'bytes': ...}
+        self.active = {}
+
+    def zone_budget(self):
+        """Bytes each zone may keep warm"""
+        return self.budget_bytes // max(1, self.zones)
+
+    def _duration(self, source):
+        if not self.duration_of:
+            return None
+        try:
+            duration = self.duration_of(source)
+        except Exception:
+            return None
+        return duration if duration and duration > 0 else None
+
+    def head_bytes(self, source, size):
+        """
+        Bytes covering `seconds` of a file, estimated from its average bitrate
+        (size / duration), or None if the duration is unknown
+        """
+        duration = self._duration(source)
+        if not self.seconds or duration is None:
+            return None
+        return int(size * min(1.0, self.seconds / duration))
+
+    def start_offset(self, source, size, start_position):
+        """Byte offset (page aligned) playback starting at start_position reads from"""
+        duration = self._duration(source)
+        if not start_position or duration is None:
+            return 0
+        position = max(0.0, start_position - START_MARGIN_SECONDS)
+        offset = int(size * min(1.0, position / duration))
+        return offset - offset % PAGE_SIZE
+
+    def is_local_file(self, source):
+        """Only regular local files can be warmed (not RTSP/HTTP streams)"""
+        return bool(source) and '://' not in source and os.path.isfile(source)
+
+    def warm(self, zone_id, source, max_bytes=None, mode=None, start_position=None):
+        """
+        Warm the part of a local file a zone is about to play
+
+        Args:
+            zone_id: Zone the file is being played in
+            source: Path to the local video file
+            max_bytes: Optional cap on bytes to warm (defaults to the zone's budget)
+            mode: 'fadvise' or 'mmap' (defaults to the warmer's mode)
+            start_position: Seconds playback starts at (state restores, rendition
+                            switches); without a known duration the head is warmed
+
+        Returns:
+            Number of bytes warmed (0 if the source cannot be warmed)
+        """
+        mode = mode or self.mode
+        if mode not in WARM_MODES:
+            raise ValueError(f"Unknown warm mode: {mode}")
+
+        if not self.is_local_file(source):
+            self.release(zone_id)
+            return 0
+
+        size = os.path.getsize(source)
+        offset = self.start_offset(source, size, start_position)
+        limit = self.zone_budget()
+        head = self.head_bytes(source, size)
+        if head is not None:
+            limit = min(limit, head)
+        if max_bytes is not None:
+            limit = min(limit, max_bytes)
+        length = min(size - offset, limit)
+        # Round down to a whole number of pages (mmap touching works per page)
+        if offset + length < size:
+            length -= length % PAGE_SIZE
+
+        # Drop whatever this zone had cached before, unless the other zone uses it
+        with self.lock:
+            previous = self.active.get(zone_id)
+            shared = any(entry['path'] == source and entry['offset'] <= offset
+                         and entry['offset'] + entry['bytes'] >= offset + length
+                         for other, entry in self.active.items() if other != zone_id)
+            self.active[zone_id] = {'path': source, 'offset': offset, 'bytes': length}
+        if previous and previous['path'] != source:
+            self._evict(previous['path'], previous['offset'], previous['bytes'])
+
+        if length <= 0:
+            return 0
+        if shared:
+            # The other zone already warmed this range: it is read once, nothing to do
+            print(f"[Zone {zone_id}] {os.path.basename(source)} already warm (shared with another zone)")
+            return length
+
+        try:
+            if mode == MODE_MMAP:
+                self._warm_mmap(source, offset, length)
+            else:
+                self._warm_fadvise(source, offset, length)
+            where = f" from {offset // (1024 * 1024)} MB" if offset else ""
+            print(f"[Zone {zone_id}] Warmed {length // (1024 * 1024)} MB of {os.path.basename(source)}{where} ({mode})")
+            return length
+        except OSError as e:
+            print(f"[Zone {zone_id}] Cache warm-up failed: {e}")
+            return 0
+
+    def release(self, zone_id):
+        """Forget a zone's active file and let the kernel reclaim its pages"""
+        with self.lock:
+            previous = self.active.pop(zone_id, None)
+        if previous:
+            self._evict(previous['path'], previous['offset'], previous['bytes'])
+
+    def get_status(self):
+        """Get warm-up state of all zones"""
+        with self.lock:
+            active = {str(zone_id): entry.copy() for zone_id, entry in self.active.items()}
+        # A range active in both zones occupies the cache once
+        ranges = {}
+        for entry in active.values():
+            ranges.setdefault(entry['path'], []).append((entry['offset'], entry['offset'] + entry['bytes']))
+        warm_bytes = 0
+        for spans in ranges.values():
+            end = 0
+            for start, stop in sorted(spans):
+                warm_bytes += max(0, stop - max(start, end))
+                end = max(end, stop)
+        return {
+            'mode': self.mode,
+            'seconds': self.seconds,
+            'budget_bytes': self.budget_bytes,
+            'zone_budget_bytes': self.zone_budget(),
+            'warm_bytes': warm_bytes,
+            'active': active
+        }
+
+    def _in_use(self, path):
+        """Check whether any zone still has this file active"""
+        with self.lock:
+            return any(entry['path'] == path for entry in self.active.values())
+
+    def _evict(self, path, offset, length):
+        """Advise the kernel that a no-longer-active file can be dropped"""
+        if self._in_use(path) or not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            # File may have been deleted in the meantime
+            pass
+
+    def _warm_fadvise(self, path, offset, length):
+        """Asynchronous readahead via posix_fadvise(WILLNEED)"""
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, offset, length, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, offset, length, os.POSIX_FADV_WILLNEED)
+            else:
+                # No fadvise on this platform, fall back to a plain read
+                os.lseek(fd, offset, os.SEEK_SET)
+                remaining = length
+                while remaining > 0:
+                    chunk = os.read(fd, min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+        finally:
+            os.close(fd)
+
+    def _warm_mmap(self, path, offset, length):
+        """Map the range and touch one byte per page so it is resident before playback"""
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as mapped:
+                if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+                    mapped.madvise(mmap.MADV_WILLNEED)
+                for offset in range(0, length, PAGE_SIZE):
+                    mapped[offset]
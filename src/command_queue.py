@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Command Queue - Per-zone worker threads for non-blocking zone control
+Zone operations (play, stop, geometry, volume...) run off the request thread,
+so a slow MPV restart in one zone never delays commands for the other zone
+"""
+
+import itertools
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+
+
+# Operation states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+COALESCED = 'coalesced'
+
+FINISHED_STATES = (DONE, FAILED, COALESCED)
+
+
+class Operation:
+    """A single queued zone operation"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, zone_id, action, func, args=(), kwargs=None):
+        self.id = f"op-{next(self._ids)}"
+        self.zone_id = zone_id
+        self.action = action
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.superseded_by = None
+
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    def is_finished(self):
+        return self.status in FINISHED_STATES
+
+    def to_dict(self):
+        """Serializable view of the operation"""
+        return {
+            'operation_id': self.id,
+            'zone_id': self.zone_id,
+            'action': self.action,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'superseded_by': self.superseded_by,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished
+        }
+
+
+class OperationTracker:
+    """Keeps recent operations so their completion can be queried or waited on"""
+
+    def __init__(self, max_operations=500):
+        self.max_operations = max_operations
+        self.operations = OrderedDict()
+        self.condition = threading.Condition()
+
+    def add(self, operation):
+        with self.condition:
+            self.operations[operation.id] = operation
+            # Drop the oldest finished operations once over the limit
+            while len(self.operations) > self.max_operations:
+                oldest_id, oldest = next(iter(self.operations.items()))
+                if not oldest.is_finished():
+                    break
+                del self.operations[oldest_id]
+
+    def get(self, operation_id):
+        with self.condition:
+            return self.operations.get(operation_id)
+
+    def notify(self):
+        """Wake up everyone waiting for an operation to finish"""
+        with self.condition:
+            self.condition.notify_all()
+
+    def wait(self, operation_id, timeout=None):
+        """
+        Block until an operation has finished (following coalesced operations
+        to the one that replaced them)
+
+        Returns:
+            The finished Operation, the still-pending one on timeout, or None if unknown
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            operation = self.operations.get(operation_id)
+            while operation is not None:
+                if operation.status == COALESCED and operation.superseded_by in self.operations:
+                    operation = self.operations[operation.superseded_by]
+                    continue
+                if operation.is_finished():
+                    return operation
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return operation
+                self.condition.wait(remaining)
+            return operation
+
+    def list(self, zone_id=None, limit=50):
+        """Most recent operations first"""
+        with self.condition:
+            operations = [op for op in self.operations.values()
+                          if zone_id is None or op.zone_id == zone_id]
+        return [op.to_dict() for op in reversed(operations[-limit:])]
+
+
+class ZoneWorker:
+    """Runs one zone's operations in order on a dedicated thread"""
+
+    def __init__(self, zone_id, tracker, listeners=()):
+        self.zone_id = zone_id
+        self.tracker = tracker
+        self.listeners = listeners
+        self.pending = deque()
+        self.current = None
+        self.condition = threading.Condition()
+
+        self.thread = threading.Thread(target=self._run, name=f"zone{zone_id}-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, operation, coalesce=(), merge=None):
+        """
+        Queue an operation
+
+        Args:
+            operation: Operation to run
+            coalesce: Actions whose still-queued operations are replaced by this one
+                      (e.g. a burst of geometry updates collapses to the latest)
+            merge: Optional callable(queued, operation) folding a replaced
+                   operation's arguments into the new one, oldest first (e.g.
+                   partial geometry updates add up instead of being lost)
+        """
+        with self.condition:
+            if coalesce:
+                kept = deque()
+                for queued in self.pending:
+                    if queued.action in coalesce:
+                        if merge:
+                            merge(queued, operation)
+                        queued.status = COALESCED
+                        queued.superseded_by = operation.id
+                        queued.finished = time.time()
+                    else:
+                        kept.append(queued)
+                self.pending = kept
+            self.pending.append(operation)
+            self.condition.notify()
+        self.tracker.notify()
+        return operation
+
+    def queued(self, action):
+        """Still-queued operations of an action, oldest first"""
+        with self.condition:
+            return [op for op in self.pending if op.action == action]
+
+    def queue_depth(self):
+        with self.condition:
+            return len(self.pending)
+
+    def get_status(self):
+        with self.condition:
+            return {
+                'zone_id': self.zone_id,
+                'queued': [op.id for op in self.pending],
+                'running': self.current.id if self.current else None
+            }
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                operation = self.pending.popleft()
+                self.current = operation
+
+            operation.status = RUNNING
+            operation.started = time.time()
+            try:
+                operation.result = operation.func(*operation.args, **operation.kwargs)
+                operation.status = DONE
+            except Exception as e:
+                print(f"[Zone {self.zone_id}] Operation {operation.action} failed: {e}")
+                traceback.print_exc()
+                operation.error = str(e)
+                operation.status = FAILED
+            operation.finished = time.time()
+
+            with self.condition:
+                self.current = None
+            self.tracker.notify()
+
+            for listener in self.listeners:
+                try:
+                    listener(operation)
+                except Exception as e:
+                    print(f"[Zone {self.zone_id}] Operation listener failed: {e}")
+
+
+class CommandDispatcher:
+    """Dispatches zone operations to per-zone worker queues"""
+
+    def __init__(self, zone_ids=(1, 2)):
+        self.tracker = OperationTracker()
+        self.listeners = []
+        self.workers = {zone_id: ZoneWorker(zone_id, self.tracker, self.listeners) for zone_id in zone_ids}
+
+    def add_listener(self, callback):
+        """Call callback(operation) on the worker thread after each operation finishes"""
+        self.listeners.append(callback)
+
+    def submit(self, zone_id, action, func, *args, coalesce=(), merge=None, **kwargs):
+        """
+        Queue func(*args, **kwargs) on a zone's worker (see ZoneWorker.submit
+        for coalesce and merge)
+
+        Returns:
+            The queued Operation
+        """
+        operation = Operation(zone_id, action, func, args, kwargs)
+        self.tracker.add(operation)
+        return self.workers[zone_id].submit(operation, coalesce, merge)
+
+    def queued(self, zone_id, action):
+        """Operations of an action still waiting on a zone's worker"""
+        return self.workers[zone_id].queued(action)
+
+    def get_operation(self, operation_id):
+        return self.tracker.get(operation_id)
+
+    def wait(self, operation_id, timeout=None):
+        return self.tracker.wait(operation_id, timeout)
+
+    def get_status(self):
+        return {
+            f'zone{zone_id}': worker.get_status()
+            for zone_id, worker in self.workers.items()
+        }
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Fleet - Drive many dual-zone players from one coordinator instance
+Discovers peers via UDP broadcast, fans out batched HTTP commands concurrently
+over pooled keep-alive connections and aggregates the results
+"""
+
+import http.client
+import json
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+DISCOVERY_PORT = 5099
+SERVICE_NAME = 'rpi-video-player'
+
+
+class PeerConnectionPool:
+    """Keep-alive HTTP connections to a single peer"""
+
+    def __init__(self, host, port, timeout=3, max_idle=4):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def request(self, method, path, body=None):
+        """
+        Send a request, reusing an idle connection when possible
+
+        Returns:
+            Tuple of (status code, decoded JSON body or None)
+        """
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+
+        # A reused connection may have been closed by the peer; retry once on a fresh one
+        for attempt in range(2):
+            connection, reused = self._acquire()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            self._release(connection, response)
+            try:
+                decoded = json.loads(data) if data else None
+            except ValueError:
+                decoded = None
+            return response.status, decoded
+
+    def close(self):
+        with self.lock:
+            for connection in self.idle:
+                connection.close()
+            self.idle = []
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, connection, response):
+        if response.will_close:
+            connection.close()
+            return
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+
+class FleetCoordinator:
+    """Tracks peer players and fans commands out to them"""
+
+    def __init__(self, port=5000, peers=None, timeout=3, max_workers=32,
+                 discovery_port=DISCOVERY_PORT, peer_expiry=30):
+        """
+        Args:
+            port: HTTP port of this instance (used to include itself in fan-outs)
+            peers: Optional list of static "host:port" peers
+            timeout: Per-request timeout in seconds
+            max_workers: Maximum concurrent peer requests
+            discovery_port: UDP port peers announce themselves on
+            peer_expiry: Seconds after which a silent discovered peer is dropped
+        """
+        self.port = port
+        self.timeout = timeout
+        self.discovery_port = discovery_port
+        self.peer_expiry = peer_expiry
+
+        self.peers = {}
+        self.pools = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fleet')
+
+        for peer in peers or []:
+            host, _, peer_port = peer.strip().rpartition(':')
+            if host:
+                self.add_peer(host, int(peer_port), source='static')
+
+    # ----------------------------------------
+    # Peer registry
+    # ----------------------------------------
+
+    def add_peer(self, host, port, source='manual', info=None):
+        """Register (or refresh) a peer and return its ID"""
+        peer_id = f"{host}:{port}"
+        with self.lock:
+            peer = self.peers.get(peer_id)
+            if peer is None:
+                peer = {'id': peer_id, 'host': host, 'port': port, 'source': source}
+                self.peers[peer_id] = peer
+                self.pools[peer_id] = PeerConnectionPool(host, port, self.timeout)
+                print(f"🛰 Fleet peer added: {peer_id} ({source})")
+            peer['last_seen'] = time.time()
+            if info:
+                peer['hostname'] = info.get('hostname')
+        return peer_id
+
+    def remove_peer(self, peer_id):
+        with self.lock:
+            peer = self.peers.pop(peer_id, None)
+            pool = self.pools.pop(peer_id, None)
+        if pool:
+            pool.close()
+        return peer is not None
+
+    def list_peers(self):
+        self._expire_peers()
+        with self.lock:
+            return [peer.copy() for peer in self.peers.values()]
+
+    def _expire_peers(self):
+        cutoff = time.time() - self.peer_expiry
+        with self.lock:
+            expired = [peer_id for peer_id, peer in self.peers.items()
+                       if peer['source'] == 'discovered' and peer['last_seen'] < cutoff]
+        for peer_id in expired:
+            print(f"🛰 Fleet peer expired: {peer_id}")
+            self.remove_peer(peer_id)
+
+    def _select(self, peer_ids=None, include_self=False):
+        """Resolve the target peers (and optionally this instance)"""
+        self._expire_peers()
+        with self.lock:
+            targets = [peer_id for peer_id in self.peers if peer_ids is None or peer_id in peer_ids]
+        if include_self:
+            local_id = f"127.0.0.1:{self.port}"
+            if local_id not in self.pools:
+                with self.lock:
+                    self.pools[local_id] = PeerConnectionPool('127.0.0.1', self.port, self.timeout)
+            if local_id not in targets:
+                targets.append(local_id)
+        return targets
+
+    # ----------------------------------------
+    # Fan-out
+    # ----------------------------------------
+
+    def request(self, peer_id, method, path, body=None):
+        """Send one request to one peer and describe the outcome"""
+        with self.lock:
+            pool = self.pools.get(peer_id)
+        if pool is None:
+            return {'peer': peer_id, 'ok': False, 'error': 'Unknown peer'}
+
+        started = time.monotonic()
+        try:
+            status, response = pool.request(method, path, body)
+            return {
+                'peer': peer_id,
+                'ok': 200 <= status < 300,
+                'status': status,
+                'response': response,
+                'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+            }
+        except (http.client.HTTPException, OSError) as e:
+            return {
+                'peer': peer_id,
+                'ok': False,
+                'error': str(e) or e.__class__.__name__,
+                'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+            }
+
+    def fan_out(self, commands, peer_ids=None, include_self=False):
+        """
+        Run a batch of commands on every peer concurrently
+        (commands run in order on each peer)
+
+        Args:
+            commands: List of dicts with method, path and optional body
+            peer_ids: Optional subset of peers to target
+            include_self: Also send the commands to this instance
+
+        Returns:
+            Dict with per-peer results and success counts
+        """
+        targets = self._select(peer_ids, include_self)
+
+        def run_batch(peer_id):
+            results = []
+            for command in commands:
+                result = self.request(peer_id, command.get('method', 'GET').upper(),
+                                      command['path'], command.get('body'))
+                results.append(result)
+                if not result['ok'] and 'status' not in result:
+                    # Peer unreachable, don't wait for the remaining commands to time out
+                    break
+            return peer_id, results
+
+        results = dict(self.executor.map(run_batch, targets))
+        succeeded = sum(1 for peer_results in results.values()
+                        if len(peer_results) == len(commands) and all(r['ok'] for r in peer_results))
+        return {
+            'peers': len(targets),
+            'succeeded': succeeded,
+            'failed': len(targets) - succeeded,
+            'results': results
+        }
+
+    def aggregate_status(self, include_self=True):
+        """Collect /api/status from every player"""
+        fan = self.fan_out([{'method': 'GET', 'path': '/api/status'}], include_self=include_self)
+        players = {}
+        for peer_id, results in fan['results'].items():
+            result = results[0]
+            if not result['ok']:
+                players[peer_id] = {'error': result.get('error') or result.get('status')}
+            elif not isinstance(result['response'], dict):
+                players[peer_id] = {'error': 'Invalid status response'}
+            else:
+                players[peer_id] = result['response']
+
+        zones_running = sum(
+            1 for status in players.values() if 'error' not in status
+            for zone in ('zone1', 'zone2')
+            if isinstance(status.get(zone), dict) and status[zone].get('running')
+        )
+        return {
+            'players': players,
+            'reachable': fan['succeeded'],
+            'unreachable': fan['failed'],
+            'zones_running': zones_running
+        }
+
+    def load_preset(self, name, at=None, lead_time=2.0, include_self=True, peer_ids=None):
+        """
+        Load a preset on every player at the same wall-clock time
+
+        Args:
+            name: Preset name
+            at: Unix timestamp to apply the preset at (players need NTP-synced clocks)
+            lead_time: Seconds from now used when no timestamp is given; must cover
+                       the slowest peer's request latency
+        """
+        at = at or time.time() + lead_time
+        result = self.fan_out([{'method': 'POST', 'path': f'/api/presets/{name}/load', 'body': {'at': at}}],
+                              peer_ids=peer_ids, include_self=include_self)
+        result['at'] = at
+        return result
+
+    # ----------------------------------------
+    # Discovery
+    # ----------------------------------------
+
+    def start_discovery(self):
+        """Listen for peer announcements"""
+        thread = threading.Thread(target=self._listen, name='fleet-discovery', daemon=True)
+        thread.start()
+
+    def _listen(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(('', self.discovery_port))
+        print(f"🛰 Fleet discovery listening on UDP {self.discovery_port}")
+
+        while True:
+            # Anyone on the LAN can send to this port: ignore anything malformed
+            try:
+                data, (host, _) = sock.recvfrom(4096)
+                message = json.loads(data)
+                if not isinstance(message, dict) or message.get('service') != SERVICE_NAME:
+                    continue
+                port = int(message['port'])
+                if not 0 < port < 65536:
+                    continue
+            except (OSError, ValueError, TypeError, KeyError):
+                continue
+            # Skip our own announcements
+            if message.get('instance') == FleetAnnouncer.instance_id:
+                continue
+            self.add_peer(host, port, source='discovered', info=message)
+
+
+class FleetAnnouncer:
+    """Periodically broadcasts this player's presence to fleet coordinators"""
+
+    # Shared with the coordinator so it can ignore its own announcements
+    instance_id = uuid.uuid4().hex
+
+    def __init__(self, port=5000, discovery_port=DISCOVERY_PORT, interval=5):
+        self.port = port
+        self.discovery_port = discovery_port
+        self.interval = interval
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='fleet-announce', daemon=True)
+        thread.start()
+
+    def _run(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        message = json.dumps({
+            'service': SERVICE_NAME,
+            'instance': self.instance_id,
+            'hostname': socket.gethostname(),
+            'port': self.port
+        }).encode('utf-8')
+
+        while True:
+            try:
+                sock.sendto(message, ('<broadcast>', self.discovery_port))
+            except OSError as e:
+                print(f"⚠️ Fleet announcement failed: {e}")
+            time.sleep(self.interval)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Geometry Stream - Live zone geometry preview from the layout canvas
+Coalesces drag updates to the display frame rate, applies them in place over
+IPC and debounces the commit until the drag settles. The commit goes through
+the same validation and layout analysis as any other geometry change
+"""
+
+import threading
+import time
+
+
+class GeometryStreamer:
+    """Rate-limits live geometry updates and debounces their commit"""
+
+    def __init__(self, zone_manager, dispatcher, commit, fps=60, commit_delay=0.5):
+        """
+        Args:
+            zone_manager: DualZoneManager whose zones are moved
+            dispatcher: CommandDispatcher the live updates are queued on
+            commit: Callable(zone_id, geometry) queuing the final geometry,
+                    returning the list of queued Operations
+            fps: Maximum rate at which updates are applied to each zone
+            commit_delay: Seconds without updates before the geometry is committed
+        """
+        self.zone_manager = zone_manager
+        self.dispatcher = dispatcher
+        self.commit_geometry = commit
+        self.fps = fps
+        self.commit_delay = commit_delay
+
+        self.condition = threading.Condition()
+        self.pending = {}        # zone_id -> latest geometry not yet applied
+        self.latest = {}         # zone_id -> geometry pushed since the last commit
+        self.commit_due = {}     # zone_id -> monotonic time the commit is due
+        self.stats = {}          # zone_id -> counters
+
+        self.thread = threading.Thread(target=self._run, name="geometry-stream", daemon=True)
+        self.thread.start()
+
+    def push(self, zone_id, geometry):
+        """
+        Queue a live geometry update (latest wins)
+
+        Returns:
+            Counters for the zone's stream
+        """
+        with self.condition:
+            self.pending.setdefault(zone_id, {}).update(geometry)
+            self.latest.setdefault(zone_id, {}).update(geometry)
+            self.commit_due[zone_id] = time.monotonic() + self.commit_delay
+            stats = self._stats(zone_id)
+            stats['received'] += 1
+            self.condition.notify()
+            return stats.copy()
+
+    def commit(self, zone_id):
+        """
+        Commit a zone's geometry now (e.g. when the drag ends)
+
+        Returns:
+            List of queued Operations
+        """
+        with self.condition:
+            geometry = self.pending.pop(zone_id, None)
+            self.commit_due.pop(zone_id, None)
+        if geometry:
+            self._apply(zone_id, geometry)
+        return self._submit_commit(zone_id)
+
+    def get_status(self):
+        with self.condition:
+            return {
+                'fps': self.fps,
+                'commit_delay': self.commit_delay,
+                'zones': {str(zone_id): stats.copy() for zone_id, stats in self.stats.items()}
+            }
+
+    def _stats(self, zone_id):
+        return self.stats.setdefault(zone_id, {'received': 0, 'applied': 0, 'commits': 0})
+
+    def _apply(self, zone_id, geometry):
+        # On the zone's worker, so a live update never runs alongside a stop, start or commit
+        self.dispatcher.submit(zone_id, 'live_geometry', self._apply_live, zone_id, geometry,
+                               coalesce=('live_geometry',))
+
+    def _apply_live(self, zone_id, geometry):
+        applied = self.zone_manager.apply_live_zone_geometry(zone_id, geometry)
+        with self.condition:
+            self._stats(zone_id)['applied'] += 1
+        return applied
+
+    def _submit_commit(self, zone_id):
+        with self.condition:
+            self._stats(zone_id)['commits'] += 1
+            geometry = self.latest.pop(zone_id, None)
+        return self.commit_geometry(zone_id, geometry)
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        while True:
+            with self.condition:
+                while not self.pending and not self.commit_due:
+                    self.condition.wait()
+                updates = self.pending
+                self.pending = {}
+
+                now = time.monotonic()
+                due = [zone_id for zone_id, deadline in self.commit_due.items() if deadline <= now]
+                for zone_id in due:
+                    del self.commit_due[zone_id]
+
+            frame_start = time.monotonic()
+            for zone_id, geometry in updates.items():
+                self._apply(zone_id, geometry)
+            for zone_id in due:
+                self._submit_commit(zone_id)
+
+            # Never apply more than one update per zone per display frame
+            elapsed = time.monotonic() - frame_start
+            if elapsed < interval:
+                time.sleep(interval - elapsed)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Governor - Thermal and load-aware playback quality control
+Samples SoC temperature, CPU clock/throttling and per-zone dropped frames, steps
+quality down before the Pi throttles (cheaper scaler, reduced decoding on
+the secondary zone, lower renditions) and back up once there is headroom
+again. Every decision is logged so the thresholds can be tuned.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+THERMAL_ZONE = '/sys/class/thermal/thermal_zone0/temp'
+CPU_FREQ = '/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq'
+CPU_MAX_FREQ = '/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq'
+# Same bits as `vcgencmd get_throttled`
+THROTTLED = '/sys/devices/platform/soc/soc:firmware/get_throttled'
+THROTTLED_NOW = 0x2 | 0x4 | 0x8  # ARM frequency capped, throttled, soft temperature limit
+
+# Degradation steps, cheapest and least visible first. Level N applies steps 1..N.
+STEPS = (
+    'scaler',          # Bilinear scaling on both zones
+    'secondary_fps',   # Secondary zone decodes reference frames only (lower fps, no loop filter)
+    'secondary_rendition',  # Secondary zone switches to a lower rendition
+    'primary_rendition',    # Primary zone switches to a lower rendition
+)
+
+DEFAULT_THRESHOLDS = {
+    'temp_high': 80.0,        # °C: degrade above this (the Pi 5 throttles at 85)
+    'temp_low': 70.0,         # °C: restore only below this
+    'drops_per_second': 2.0,  # Degrade when a zone drops more frames than this
+    'cooldown': 15,           # Seconds to let a change take effect before degrading further
+    'recover_samples': 6      # Consecutive calm samples required before restoring a step
+}
+
+# Lower renditions are sibling files: show.mp4 -> show_720p.mp4, show_540p.mp4
+RENDITION_SUFFIXES = ('_720p', '_540p', '_480p')
+
+DEGRADED_SCALER = 'bilinear'
+
+
+def find_rendition(source):
+    """Lower-resolution sibling of a local file, or None"""
+    if not source or '://' in source:
+        return None
+    stem, ext = os.path.splitext(source)
+    for suffix in RENDITION_SUFFIXES:
+        if stem.endswith(suffix):
+            return None
+        candidate = f"{stem}{suffix}{ext}"
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def _read_number(path, base=10):
+    try:
+        with open(path, 'r') as f:
+            value = f.read().strip()
+        return int(value, base) if base != 10 else float(value)
+    except (OSError, ValueError):
+        return None
+
+
+class QualityGovernor:
+    """Steps zone quality down under thermal/decode pressure and back up with headroom"""
+
+    def __init__(self, zone_manager, dispatcher, interval=5, primary_zone=1, thresholds=None, enabled=True):
+        """
+        Args:
+            zone_manager: DualZoneManager whose zones are governed
+            dispatcher: CommandDispatcher the quality changes are queued on
+            interval: Seconds between samples
+            primary_zone: Zone degraded last (the other one is the secondary zone)
+            thresholds: Overrides for DEFAULT_THRESHOLDS
+            enabled: Act on samples (when disabled, samples are still taken for the status)
+        """
+        self.zone_manager = zone_manager
+        self.dispatcher = dispatcher
+        self.interval = interval
+        self.primary_zone = primary_zone
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+
+        self.enabled = enabled
+        self.level = 0
+        self.calm_samples = 0
+        self.last_change = 0.0
+        self.last_sample = None
+        self.last_drops = {}
+        self.decisions = deque(maxlen=200)
+        self.lock = threading.Lock()
+
+        self.max_freq = _read_number(CPU_MAX_FREQ)
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='quality-governor', daemon=True)
+        thread.start()
+
+    # ----------------------------------------
+    # Sampling
+    # ----------------------------------------
+
+    def sample(self):
+        """Read temperature, CPU clock and per-zone drop rates"""
+        now = time.monotonic()
+        temp = _read_number(THERMAL_ZONE)
+        freq = _read_number(CPU_FREQ)
+        throttled = _read_number(THROTTLED, base=16)
+
+        zones = {}
+        for zone in (self.zone_manager.zone1, self.zone_manager.zone2):
+            drops = zone.get_frame_drops()
+            if not drops:
+                self.last_drops.pop(zone.zone_id, None)
+                continue
+            # Only frames the display missed count: decoder drops are deliberate once
+            # the secondary zone is degraded and would feed back into more degrading
+            total = drops.get('vo') or 0
+            previous = self.last_drops.get(zone.zone_id)
+            self.last_drops[zone.zone_id] = (now, total)
+            rate = None
+            # A restarted MPV starts counting from zero again
+            if previous and total >= previous[1] and now > previous[0]:
+                rate = round((total - previous[1]) / (now - previous[0]), 2)
+            zones[f'zone{zone.zone_id}'] = {
+                'dropped': total,
+                'decoder_dropped': drops.get('decoder'),
+                'drops_per_second': rate
+            }
+
+        return {
+            'time': time.time(),
+            'temp': round(temp / 1000, 1) if temp is not None else None,
+            'cpu_freq_mhz': round(freq / 1000) if freq is not None else None,
+            'freq_ratio': round(freq / self.max_freq, 2) if freq and self.max_freq else None,
+            'throttled': hex(throttled) if throttled is not None else None,
+            'zones': zones
+        }
+
+    def pressure(self, sample):
+        """Reasons the system is under pressure (empty list if none)"""
+        t = self.thresholds
+        reasons = []
+        if sample['temp'] is not None and sample['temp'] >= t['temp_high']:
+            reasons.append(f"temperature {sample['temp']}°C >= {t['temp_high']}°C")
+        # The clock alone means little (it drops when idle); the firmware says when it is capped
+        if sample['throttled'] is not None and int(sample['throttled'], 16) & THROTTLED_NOW:
+            reasons.append(f"firmware throttling ({sample['throttled']}) at {sample['cpu_freq_mhz']} MHz")
+        for name, zone in sample['zones'].items():
+            if zone['drops_per_second'] is not None and zone['drops_per_second'] > t['drops_per_second']:
+                reasons.append(f"{name} dropping {zone['drops_per_second']} frames/s")
+        return reasons
+
+    def headroom(self, sample):
+        """True if quality could be raised again"""
+        if sample['temp'] is not None and sample['temp'] > self.thresholds['temp_low']:
+            return False
+        return not self.pressure(sample)
+
+    # ----------------------------------------
+    # Decisions
+    # ----------------------------------------
+
+    def evaluate(self, sample):
+        """Decide on a level change for one sample, returning the decision or None"""
+        now = time.monotonic()
+        reasons = self.pressure(sample)
+
+        with self.lock:
+            if reasons:
+                self.calm_samples = 0
+                if self.level < len(STEPS) and now - self.last_change >= self.thresholds['cooldown']:
+                    return self._change(self.level + 1, 'degrade', '; '.join(reasons), sample, now)
+                return None
+
+            if self.level > 0 and self.headroom(sample):
+                self.calm_samples += 1
+                if self.calm_samples >= self.thresholds['recover_samples']:
+                    self.calm_samples = 0
+                    return self._change(self.level - 1, 'restore',
+                                        f"{self.thresholds['recover_samples']} samples with headroom", sample, now)
+            else:
+                self.calm_samples = 0
+            return None
+
+    def _change(self, level, action, reason, sample, now):
+        step = STEPS[max(level, self.level) - 1]
+        decision = {
+            'time': sample['time'],
+            'action': action,
+            'step': step,
+            'from_level': self.level,
+            'to_level': level,
+            'reason': reason,
+            'sample': sample
+        }
+        self.level = level
+        self.last_change = now
+        self.decisions.append(decision)
+        print(f"🌡 Governor {action}: {step} (level {decision['from_level']} -> {level}) - {reason}")
+        return decision
+
+    def zone_quality(self, zone_id, level=None):
+        """
+        Quality settings for a zone at a degradation level
+
+        Returns:
+            Tuple of (quality dict for MPVInstance.set_quality, rendition or None)
+        """
+        level = self.level if level is None else level
+        active = STEPS[:level]
+        primary = zone_id == self.primary_zone
+
+        quality = {}
+        if 'scaler' in active:
+            quality['scale'] = DEGRADED_SCALER
+        if not primary and 'secondary_fps' in active:
+            quality['skip_frames'] = True
+
+        wants_rendition = 'primary_rendition' in active if primary else 'secondary_rendition' in active
+        rendition = None
+        zone = self.zone_manager.zone1 if zone_id == 1 else self.zone_manager.zone2
+        if wants_rendition and zone.is_running() and not zone.playlist:
+            rendition = find_rendition(zone.rendition_of or zone.current_source)
+            if rendition == zone.failed_rendition:
+                rendition = None
+        return quality, rendition
+
+    def apply(self):
+        """Queue the current level's settings on every zone that differs from it"""
+        operations = []
+        for zone in (self.zone_manager.zone1, self.zone_manager.zone2):
+            quality, rendition = self.zone_quality(zone.zone_id)
+            playing_rendition = zone.current_source if zone.rendition_of else None
+            if quality == zone.quality and rendition == playing_rendition:
+                continue
+            operations.append(self.dispatcher.submit(
+                zone.zone_id, 'quality', self.zone_manager.set_zone_quality,
+                zone.zone_id, quality, rendition, coalesce=('quality',)
+            ))
+        return operations
+
+    # ----------------------------------------
+    # Control
+    # ----------------------------------------
+
+    def configure(self, enabled=None, thresholds=None):
+        """
+        Enable/disable the governor or tune its thresholds
+
+        Raises:
+            ValueError: For unknown threshold names or non-numeric values
+        """
+        thresholds = thresholds or {}
+        for key, value in thresholds.items():
+            if key not in DEFAULT_THRESHOLDS:
+                raise ValueError(f"Unknown threshold '{key}'")
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ValueError(f"Threshold '{key}' must be a number")
+
+        with self.lock:
+            self.thresholds.update(thresholds)
+            if enabled is not None:
+                self.enabled = bool(enabled)
+                if not self.enabled and self.level:
+                    # Disabling hands full quality back
+                    self._change(0, 'restore', 'governor disabled', self.last_sample or {'time': time.time()},
+                                 time.monotonic())
+        self.apply()
+
+    def get_status(self, decisions=20):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'level': self.level,
+                'active_steps': list(STEPS[:self.level]),
+                'steps': list(STEPS),
+                'primary_zone': self.primary_zone,
+                'interval': self.interval,
+                'thresholds': dict(self.thresholds),
+                'last_sample': self.last_sample,
+                'decisions': list(self.decisions)[-decisions:] if decisions else []
+            }
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                sample = self.sample()
+                self.last_sample = sample
+                if not self.enabled:
+                    continue
+                # Re-applied every sample so newly started zones pick up the current level
+                self.evaluate(sample)
+                self.apply()
+            except Exception as e:
+                print(f"⚠️ Governor sample failed: {e}")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Layout - Geometry validation and layout solving for dual-zone configurations
+Detects zones that are zero-sized, off-screen or fully covered so they are not
+decoded, scales layouts between display resolutions and snaps zones to LED
+cabinet grids
+"""
+
+
+GEOMETRY_KEYS = ('x', 'y', 'width', 'height')
+
+# Zone 2 is drawn above zone 1 (matches the layout canvas)
+STACKING_ORDER = ('zone1', 'zone2')
+
+
+def normalize_geometry(geometry):
+    """
+    Convert a geometry dict to integers with all keys present
+
+    Raises:
+        ValueError: If a value is missing or not a number
+    """
+    if not isinstance(geometry, dict):
+        raise ValueError("Geometry must be an object with x, y, width and height")
+
+    normalized = {}
+    for key in GEOMETRY_KEYS:
+        if key not in geometry:
+            raise ValueError(f"Geometry is missing '{key}'")
+        try:
+            normalized[key] = int(round(float(geometry[key])))
+        except (TypeError, ValueError):
+            raise ValueError(f"Geometry '{key}' must be a number, got {geometry[key]!r}")
+    return normalized
+
+
+def normalize_display(display):
+    """
+    Convert a display resolution dict to positive integers
+
+    Raises:
+        ValueError: If width or height is missing, not a number or not positive
+    """
+    if not isinstance(display, dict):
+        raise ValueError("Display resolution must be an object with width and height")
+
+    normalized = {}
+    for key in ('width', 'height'):
+        try:
+            normalized[key] = int(display[key])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Display resolution '{key}' must be a number, got {display.get(key)!r}")
+        if normalized[key] <= 0:
+            raise ValueError(f"Display resolution '{key}' must be positive, got {normalized[key]}")
+    return normalized
+
+
+def is_zero_area(geometry):
+    """A zone with no width or height is disabled"""
+    return geometry['width'] <= 0 or geometry['height'] <= 0
+
+
+def validate_geometry(geometry, display):
+    """
+    Validate a zone geometry against the display resolution
+
+    Zero-sized zones are valid (they disable the zone); negative sizes,
+    negative positions and zones extending past the display are not.
+
+    Returns:
+        The normalized geometry
+
+    Raises:
+        ValueError: Describing the first problem found
+    """
+    g = normalize_geometry(geometry)
+
+    if g['width'] < 0 or g['height'] < 0:
+        raise ValueError(f"Zone size cannot be negative ({g['width']}x{g['height']})")
+    if is_zero_area(g):
+        return g
+    if g['x'] < 0 or g['y'] < 0:
+        raise ValueError(f"Zone position cannot be negative ({g['x']}, {g['y']})")
+    if g['x'] + g['width'] > display['width'] or g['y'] + g['height'] > display['height']:
+        raise ValueError(
+            f"Zone {g['width']}x{g['height']}+{g['x']}+{g['y']} exceeds the "
+            f"{display['width']}x{display['height']} display"
+        )
+    return g
+
+
+def intersection(a, b):
+    """Overlapping rectangle of two geometries, or None"""
+    left = max(a['x'], b['x'])
+    top = max(a['y'], b['y'])
+    right = min(a['x'] + a['width'], b['x'] + b['width'])
+    bottom = min(a['y'] + a['height'], b['y'] + b['height'])
+    if right <= left or bottom <= top:
+        return None
+    return {'x': left, 'y': top, 'width': right - left, 'height': bottom - top}
+
+
+def area(geometry):
+    if not geometry or is_zero_area(geometry):
+        return 0
+    return geometry['width'] * geometry['height']
+
+
+def analyze_layout(zones, display):
+    """
+    Compute visibility of each zone, taking stacking order into account
+
+    Args:
+        zones: Dict of zone name ('zone1', 'zone2') -> geometry
+        display: Dict with display width and height
+
+    Returns:
+        Dict with per-zone area, visible area, overlap and whether the zone
+        needs decoding, plus the total overlap between zones
+    """
+    screen = {'x': 0, 'y': 0, 'width': display['width'], 'height': display['height']}
+    names = [name for name in STACKING_ORDER if name in zones]
+    geometries = {name: normalize_geometry(zones[name]) for name in names}
+
+    result = {'zones': {}, 'overlap': 0}
+    for index, name in enumerate(names):
+        g = geometries[name]
+        on_screen = intersection(g, screen) if not is_zero_area(g) else None
+        visible = area(on_screen)
+
+        # Area covered by zones stacked above this one
+        covered = 0
+        for above in names[index + 1:]:
+            covered += area(intersection(on_screen, geometries[above])) if on_screen else 0
+        visible = max(0, visible - covered)
+
+        if is_zero_area(g):
+            reason = 'zero-area'
+        elif not on_screen:
+            reason = 'off-screen'
+        elif visible == 0:
+            reason = 'occluded'
+        else:
+            reason = None
+
+        result['zones'][name] = {
+            'area': area(g),
+            'visible_area': visible,
+            'occluded_area': covered,
+            'decode': reason is None,
+            'skip_reason': reason
+        }
+
+    if len(names) == 2:
+        result['overlap'] = area(intersection(geometries[names[0]], geometries[names[1]]))
+    return result
+
+
+def scale_geometry(geometry, from_display, to_display):
+    """Scale a geometry from one display resolution to another"""
+    g = normalize_geometry(geometry)
+    sx = to_display['width'] / from_display['width']
+    sy = to_display['height'] / from_display['height']
+
+    # Scale the edges rather than the size so adjacent zones stay adjacent
+    left = round(g['x'] * sx)
+    top = round(g['y'] * sy)
+    right = round((g['x'] + g['width']) * sx)
+    bottom = round((g['y'] + g['height']) * sy)
+    return {'x': left, 'y': top, 'width': right - left, 'height': bottom - top}
+
+
+def snap_to_grid(geometry, grid, display=None):
+    """
+    Snap a geometry's edges to an LED cabinet grid
+
+    Args:
+        geometry: Zone geometry
+        grid: Dict with cabinet width and height in pixels
+        display: Optional display resolution to clamp the result to
+    """
+    g = normalize_geometry(geometry)
+    if is_zero_area(g):
+        return g
+
+    cell_w = int(grid.get('width') or 0)
+    cell_h = int(grid.get('height') or 0)
+    if cell_w <= 0 or cell_h <= 0:
+        raise ValueError("Grid width and height must be positive")
+
+    def snap(value, cell):
+        return int(round(value / cell)) * cell
+
+    left = snap(g['x'], cell_w)
+    top = snap(g['y'], cell_h)
+    if display:
+        # A zone at the right/bottom edge keeps at least one cell on screen
+        left = max(0, min(left, display['width'] - cell_w))
+        top = max(0, min(top, display['height'] - cell_h))
+    # Never snap a zone down to nothing
+    right = max(left + cell_w, snap(g['x'] + g['width'], cell_w))
+    bottom = max(top + cell_h, snap(g['y'] + g['height'], cell_h))
+
+    if display:
+        right = min(right, display['width'])
+        bottom = min(bottom, display['height'])
+    return {'x': left, 'y': top, 'width': right - left, 'height': bottom - top}
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Media Index - Keyframe index and named cue points for uploaded media
+The keyframe positions of each uploaded video are probed once with ffprobe
+and stored next to its cue points, so a seek can be planned (keyframe or
+frame-exact) and its decode cost reported before it is sent to MPV
+"""
+
+import bisect
+import json
+import math
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from priority import lower_priority
+
+
+SEEK_MODES = ('auto', 'absolute', 'exact', 'keyframe')
+
+# MPV seek flags of the modes that don't depend on the target ('auto' picks per seek)
+SEEK_FLAGS = {'absolute': 'absolute', 'exact': 'absolute+exact', 'keyframe': 'absolute+keyframes'}
+
+# A target this close to a keyframe is reached by a plain keyframe seek
+KEYFRAME_TOLERANCE = 0.001
+
+
+class MediaIndex:
+    """Per-file metadata (keyframes, frame rate, cue points) stored as JSON sidecars"""
+
+    def __init__(self, media_dir, index_dir, workers=1):
+        """
+        Args:
+            media_dir: Directory uploaded media lives in
+            index_dir: Directory the metadata files are written to
+            workers: Concurrent ffprobe runs (kept low, probing competes with playback)
+        """
+        self.media_dir = media_dir
+        self.index_dir = index_dir
+        self.lock = threading.Lock()
+        self.cache = {}
+        self.building = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='media-index')
+        os.makedirs(index_dir, exist_ok=True)
+
+    # ----------------------------------------
+    # Index storage
+    # ----------------------------------------
+
+    def name_for(self, source):
+        """Index name of a source, or None if it is not an uploaded file"""
+        if not source or '://' in source:
+            return None
+        if os.path.dirname(os.path.abspath(source)) != os.path.abspath(self.media_dir):
+            return None
+        return os.path.basename(source)
+
+    def duration(self, source):
+        """Duration in seconds of an indexed upload, or None"""
+        name = self.name_for(source)
+        entry = self.get(name) if name else None
+        return entry['duration'] if entry else None
+
+    def _index_path(self, name):
+        return os.path.join(self.index_dir, f"{name}.json")
+
+    def get(self, name):
+        """
+        Metadata for an uploaded file
+
+        Returns:
+            Dict with keyframes, fps, duration and cues, or None if not indexed
+        """
+        with self.lock:
+            if name in self.cache:
+                return self.cache[name]
+        entry = self._read(name)
+        if entry is None:
+            return None
+
+        # Rebuild when the file was replaced after indexing (cues are kept)
+        path = os.path.join(self.media_dir, name)
+        if os.path.exists(path) and os.path.getmtime(path) != entry.get('mtime'):
+            self.build_async(path)
+        with self.lock:
+            self.cache[name] = entry
+        return entry
+
+    def _read(self, name):
+        try:
+            with open(self._index_path(name), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, name, entry):
+        tmp = f"{self._index_path(name)}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._index_path(name))
+        with self.lock:
+            self.cache[name] = entry
+
+    def remove(self, name):
+        with self.lock:
+            self.cache.pop(name, None)
+        try:
+            os.remove(self._index_path(name))
+        except OSError:
+            pass
+
+    # ----------------------------------------
+    # Building
+    # ----------------------------------------
+
+    def build_async(self, path):
+        """Queue indexing of a file (e.g. right after upload)"""
+        name = os.path.basename(path)
+        with self.lock:
+            future = self.building.get(name)
+            if future is not None:
+                return future
+            future = self.executor.submit(self.build, path)
+            self.building[name] = future
+        future.add_done_callback(lambda _: self._built(name))
+        return future
+
+    def _built(self, name):
+        with self.lock:
+            self.building.pop(name, None)
+
+    def is_building(self, name):
+        with self.lock:
+            return name in self.building
+
+    def build(self, path):
+        """
+        Probe a video's keyframes and store them with its metadata
+
+        Returns:
+            The stored entry, or None if the file could not be probed
+        """
+        name = os.path.basename(path)
+        try:
+            info = self._probe_stream(path)
+            keyframes = self._probe_keyframes(path)
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            print(f"⚠️ Could not index {name}: {e}")
+            return None
+
+        previous = self._read(name) or {}
+        gops = [b - a for a, b in zip(keyframes, keyframes[1:])]
+        entry = {
+            'name': name,
+            'mtime': os.path.getmtime(path),
+            'duration': info['duration'],
+            'fps': info['fps'],
+            'keyframes': keyframes,
+            'gop': {
+                'max': round(max(gops), 3) if gops else None,
+                'mean': round(sum(gops) / len(gops), 3) if gops else None
+            },
+            'cues': previous.get('cues', {})
+        }
+        self._store(name, entry)
+        print(f"🔑 Indexed {name}: {len(keyframes)} keyframes, max GOP {entry['gop']['max']}s")
+        return entry
+
+    def _probe_stream(self, path):
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=avg_frame_rate:format=duration', '-of', 'json', path],
+            capture_output=True, text=True, timeout=30, check=True, preexec_fn=lower_priority
+        )
+        data = json.loads(result.stdout)
+        streams = data.get('streams') or []
+        if not streams:
+            raise ValueError("no video stream")
+        num, _, den = streams[0].get('avg_frame_rate', '0/1').partition('/')
+        fps = float(num) / float(den) if den and float(den) else None
+        duration = data.get('format', {}).get('duration')
+        return {'fps': round(fps, 3) if fps else None,
+                'duration': float(duration) if duration else None}
+
+    def _probe_keyframes(self, path):
+        # Packet flags only: the file is demuxed, nothing is decoded
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=600, check=True, preexec_fn=lower_priority
+        )
+        keyframes = []
+        for line in result.stdout.splitlines():
+            pts, _, flags = line.partition(',')
+            if 'K' in flags and pts not in ('', 'N/A'):
+                keyframes.append(round(float(pts), 3))
+        keyframes.sort()
+        return keyframes
+
+    # ----------------------------------------
+    # Cue points
+    # ----------------------------------------
+
+    def set_cue(self, name, cue, position, snap=False):
+        """
+        Add or move a named cue point
+
+        Args:
+            name: Indexed file name
+            cue: Cue point name
+            position: Position in seconds
+            snap: Move the cue to the nearest keyframe so returning to it needs no decoding
+
+        Raises:
+            ValueError: If the file is not indexed or the position is not a
+                        number or out of range
+        """
+        entry = self.get(name)
+        if entry is None:
+            raise ValueError(f"{name} has no media index")
+        try:
+            position = float(position)
+        except (TypeError, ValueError):
+            raise ValueError(f"Cue position must be a number of seconds, got {position!r}")
+        if not math.isfinite(position):
+            raise ValueError(f"Cue position must be a number of seconds, got {position!r}")
+        if position < 0 or (entry['duration'] and position > entry['duration']):
+            raise ValueError(f"Cue position {position} is outside the file (0-{entry['duration']})")
+        if snap and entry['keyframes']:
+            position = min(entry['keyframes'], key=lambda k: abs(k - position))
+
+        entry = dict(entry, cues=dict(entry['cues'], **{cue: round(position, 3)}))
+        self._store(name, entry)
+        return entry['cues'][cue]
+
+    def delete_cue(self, name, cue):
+        entry = self.get(name)
+        if entry is None or cue not in entry['cues']:
+            return False
+        cues = dict(entry['cues'])
+        del cues[cue]
+        self._store(name, dict(entry, cues=cues))
+        return True
+
+    # ----------------------------------------
+    # Seek planning
+    # ----------------------------------------
+
+    def plan_seek(self, name, position, mode='auto'):
+        """
+        Work out how a seek to position will be performed and what it costs
+
+        Args:
+            name: Indexed file name (None for sources without an index)
+            position: Target position in seconds
+            mode: 'keyframe' (snap to the previous keyframe, no decoding),
+                  'exact' (decode up to the target frame), 'absolute' (MPV's
+                  plain absolute seek, which --hr-seek makes precise by
+                  default, so it decodes like 'exact') or 'auto' (exact,
+                  unless the target already is a keyframe)
+
+        Returns:
+            Dict with the MPV seek flags, the keyframe the demuxer starts at
+            and how many seconds/frames have to be decoded to reach the target
+        """
+        entry = self.get(name) if name else None
+        plan = {'position': position, 'mode': mode, 'indexed': entry is not None}
+
+        if entry is None or not entry['keyframes']:
+            plan['flags'] = SEEK_FLAGS.get(mode, 'absolute+exact')
+            return plan
+
+        keyframes = entry['keyframes']
+        index = max(0, bisect.bisect_right(keyframes, position + KEYFRAME_TOLERANCE) - 1)
+        keyframe = keyframes[index]
+        decode = max(0.0, position - keyframe)
+
+        if mode == 'keyframe' or decode <= KEYFRAME_TOLERANCE:
+            plan.update(flags=SEEK_FLAGS.get(mode, 'absolute+keyframes'), reached=keyframe,
+                        decode_seconds=0.0, decode_frames=0)
+        else:
+            plan.update(flags=SEEK_FLAGS.get(mode, 'absolute+exact'), reached=position,
+                        decode_seconds=round(decode, 3),
+                        decode_frames=round(decode * entry['fps']) if entry['fps'] else None)
+        plan['keyframe'] = keyframe
+        return plan
+
+    def summary(self, name, keyframes=False):
+        """Metadata for the API (the keyframe list only on request)"""
+        entry = self.get(name)
+        if entry is None:
+            return None
+        result = {key: value for key, value in entry.items() if key != 'keyframes'}
+        result['keyframe_count'] = len(entry['keyframes'])
+        if keyframes:
+            result['keyframes'] = entry['keyframes']
+        return result
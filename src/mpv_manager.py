@@ -10,19 +10,48 @@ import signal
 import time
 import json
 import socket
+import glob
+import re
 from pathlib import Path
 
+from cache_warmer import CacheWarmer
+from layout import analyze_layout, is_zero_area
+from zone_log import ZoneLog, MSG_LEVEL
+
+# The geometry property only moves/resizes an existing X11 window from this
+# MPV version on; older versions (0.35 on Bookworm) reply success and do nothing
+LIVE_GEOMETRY_MIN_VERSION = (0, 38)
+
+
+def x_server_running():
+    """True if an X server is up (it holds DRM master on the display card)"""
+    return bool(glob.glob('/tmp/.X11-unix/X*'))
+
 
 class MPVInstance:
     """Manages a single MPV instance with DRM/KMS output"""
     
-    def __init__(self, zone_id, socket_path="/tmp/mpvsocket"):
+    def __init__(self, zone_id, socket_path="/tmp/mpvsocket", warmer=None):
         self.zone_id = zone_id
+        self.warmer = warmer
         self.socket_path = f"{socket_path}-zone{zone_id}"
         self.process = None
         self.current_source = None
         self.is_paused = False
         
+        # MPV's output (stdout and stderr) is drained into this ring buffer for the lifetime of each process
+        self.log = ZoneLog(zone_id)
+        
+        # Set when the current geometry was applied in place over IPC
+        # rather than by restarting MPV
+        self.live_geometry_applied = False
+        self.mpv_version = None
+        
+        # Source kept while the zone is not decoded because it is zero-sized
+        # or fully hidden; playback resumes when it becomes visible again
+        self.suspended_source = None
+        self.suspend_reason = None
+        
         # Default geometry (will be overridden)
         self.geometry = {
             'x': 0,
@@ -35,18 +64,54 @@ class MPVInstance:
         self.volume = 50
         self.loop = True
         
-    def start(self, source, geometry=None, volume=None, loop=None):
+        # Audio policy: 'on', 'mute' (no audio decoding at all) or 'duck'
+        # (lowered to duck_level while the other zone is audible), plus an
+        # optional output device so the zones don't contend for one ALSA sink
+        self.audio = {'mode': 'on', 'device': None, 'duck_level': 20}
+        self.ducked = False
+        
+        # Output binding: None renders through X11, a dict binds the zone to a
+        # DRM connector (see set_output)
+        self.output = None
+        
+        # Slideshow playlist entries ({'path', 'duration'}), None for plain playback
+        self.playlist = None
+        self.image_duration = None
+        self.start_position = None
+        self.start_paused = False
+        
+        # Timing of the last absolute seek ({'position', 'flags', 'elapsed_ms'})
+        self.last_seek = None
+        
+        # Quality governor degradations: scale (scaler name) and skip_frames
+        # (decode reference frames only). While a lower rendition plays,
+        # rendition_of holds the original source.
+        self.quality = {}
+        self.rendition_of = None
+        self.failed_rendition = None
+        self.default_scale = None
+        
+    def start(self, source, geometry=None, volume=None, loop=None, warm=False, image_duration=None,
+              start_position=None, paused=False):
         """
         Start MPV with specified source (file path or RTSP URL)
         
         Args:
-            source: Path to video file or RTSP URL
+            source: Path to video file, still image or RTSP URL
             geometry: Dict with x, y, width, height
             volume: Volume level 0-100
             loop: Boolean for loop playback
+            warm: Pre-load the part of a local file about to play into the page
+                  cache (True, or 'fadvise' / 'mmap' to pick the strategy)
+            image_duration: Seconds to show still images (default: forever)
+            start_position: Seconds into the source to start at (state restore)
+            paused: Start paused on the first frame (restarts of a paused zone)
         """
         # Stop any existing instance
         self.stop()
+        self.image_duration = image_duration
+        self.start_position = start_position
+        self.start_paused = paused
         
         # Update settings if provided
         if geometry:
@@ -55,6 +120,18 @@ class MPVInstance:
             self.volume = volume
         if loop is not None:
             self.loop = loop
+        
+        # A zero-sized zone shows nothing, don't spend a decoder on it
+        if is_zero_area(self.geometry):
+            self.suspended_source = source
+            self.suspend_reason = 'zero-area'
+            print(f"[Zone {self.zone_id}] Zero-size geometry, not starting MPV")
+            return True
+        
+        # Warm the page cache so the demuxer doesn't wait on cold SD reads
+        if warm and self.warmer:
+            self.warmer.warm(self.zone_id, source, mode=warm if isinstance(warm, str) else None,
+                             start_position=start_position)
             
         # Build MPV command for headless DRM/KMS output
         cmd = self._build_command(source)
@@ -65,13 +142,17 @@ class MPVInstance:
             
             self.process = subprocess.Popen(
                 cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 stdin=subprocess.DEVNULL
             )
             
+            # MPV logs to stdout: merge stderr into it and keep the pipe drained, a full pipe blocks MPV mid-playback
+            log_reader = self.log.attach(self.process)
+            
             self.current_source = source
-            self.is_paused = False
+            self.is_paused = paused
+            self.live_geometry_applied = False
             
             # Wait a moment to verify startup
             time.sleep(0.3)
@@ -80,8 +161,9 @@ class MPVInstance:
                 print(f"[Zone {self.zone_id}] MPV started successfully (PID: {self.process.pid})")
                 return True
             else:
-                stderr_output = self.process.stderr.read().decode('utf-8', errors='ignore')
-                print(f"[Zone {self.zone_id}] MPV failed to start: {stderr_output}")
+                log_reader.join(timeout=1)
+                output = '\n'.join(self.log.tail(self.process.pid))
+                print(f"[Zone {self.zone_id}] MPV failed to start: {output}")
                 self.process = None
                 return False
                 
@@ -91,7 +173,7 @@ class MPVInstance:
             return False
     
     def _build_command(self, source):
-        """Build MPV command with all necessary flags for X11 GPU output"""
+        """Build MPV command with all necessary flags for X11 or DRM/KMS GPU output"""
         
         cmd = [
             'mpv',
@@ -100,26 +182,28 @@ class MPVInstance:
             '--no-border',
             '--no-osc',
             '--no-osd-bar',
-            '--really-quiet',
+            '--quiet',
+            f'--msg-level={MSG_LEVEL}',
+            '--msg-module',
             '--keep-open=yes',
+            *([f'--start={self.start_position:.2f}'] if self.start_position else []),
+            *(['--pause'] if self.start_paused else []),
             
-            # X11 video output with GPU acceleration
-            '--vo=gpu',
-            '--gpu-context=x11egl',
-            
-            # Window geometry (position and size)
-            f'--geometry={self.geometry["width"]}x{self.geometry["height"]}+{self.geometry["x"]}+{self.geometry["y"]}',
-            '--autofit-larger=100%x100%',
+            # Video output (X11 window or DRM connector/planes) with GPU acceleration
+            *self._video_output_args(),
             
             # IPC control socket
             f'--input-ipc-server={self.socket_path}',
             
-            # Volume
-            f'--volume={self.volume}',
+            # Audio (muted zones skip audio decoding entirely)
+            *self._audio_args(),
             
             # Loop settings
             '--loop-playlist=inf' if self.loop else '--loop-playlist=no',
             
+            # Still images: show a lone image forever instead of reloading it every second
+            f'--image-display-duration={self.image_duration or "inf"}',
+            
             # Window settings
             '--force-window=yes',
             '--idle=yes',
@@ -133,8 +217,15 @@ class MPVInstance:
             '--video-aspect-override=-1',
             '--panscan=1.0',
             
-            # Hardware acceleration
-            '--hwdec=auto',
+            # Reduced quality while the governor is degrading this zone
+            *self._quality_args(),
+            
+            # Hardware acceleration (drm = zero-copy DRM-prime frames)
+            '--hwdec=drm' if self.output and self.output.get('zero_copy') else '--hwdec=auto',
+            
+            # Snapshots for remote monitoring (scaled down by the snapshot service)
+            '--screenshot-format=jpg',
+            '--screenshot-jpeg-quality=80',
             
             # Cache for streams
             '--cache=yes',
@@ -151,6 +242,220 @@ class MPVInstance:
         
         return cmd
     
+    def _quality_args(self):
+        """Flags for the governor's current degradations"""
+        args = []
+        if self.quality.get('scale'):
+            args.append(f"--scale={self.quality['scale']}")
+        if self.quality.get('skip_frames'):
+            args += ['--vd-lavc-skipframe=nonref', '--vd-lavc-skiploopfilter=all', '--framedrop=decoder+vo']
+        return args
+    
+    def set_quality(self, quality, rendition=None):
+        """
+        Apply quality governor settings
+        
+        Args:
+            quality: Dict with optional scale and skip_frames
+            rendition: Lower-rendition file to play instead of the current
+                       one, None to play the original
+        """
+        previous = self.quality
+        self.quality = dict(quality)
+        if not self.is_running():
+            return True
+        
+        ok = True
+        if quality.get('scale') != previous.get('scale'):
+            if not previous.get('scale') and self.default_scale is None:
+                reply = self._request(['get_property', 'scale'])
+                self.default_scale = reply.get('data') if reply and reply.get('error') == 'success' else None
+            scale = quality.get('scale') or self.default_scale
+            if scale:
+                ok = self._set_property('scale', scale) and ok
+        
+        if bool(quality.get('skip_frames')) != bool(previous.get('skip_frames')):
+            skip = bool(quality.get('skip_frames'))
+            ok = self._set_property('vd-lavc-skipframe', 'nonref' if skip else 'default') and ok
+            ok = self._set_property('vd-lavc-skiploopfilter', 'all' if skip else 'default') and ok
+            ok = self._set_property('framedrop', 'decoder+vo' if skip else 'vo') and ok
+            # Decoder options only take effect once the decoder is recreated
+            reply = self._request(['video-reload'])
+            ok = ok and reply is not None and reply.get('error') == 'success'
+        
+        original = self.rendition_of or self.current_source
+        target = rendition or original
+        if target != self.current_source and not self.playlist:
+            position = self.get_position()
+            print(f"[Zone {self.zone_id}] Switching to {os.path.basename(target)} at {position}s")
+            paused = self.is_paused
+            if self.start(target, warm=True, start_position=position, paused=paused):
+                self.wait_for_first_frame()
+                self.rendition_of = original if rendition else None
+            else:
+                # Don't try this rendition again, go back to the original
+                self.failed_rendition = rendition
+                self.start(original, warm=True, start_position=position, paused=paused)
+                ok = False
+        return ok
+    
+    def _audio_args(self):
+        """Audio flags for the zone's audio policy"""
+        if self.audio['mode'] == 'mute':
+            return ['--aid=no']
+        
+        args = [f'--volume={self.effective_volume()}']
+        if self.audio.get('device'):
+            args.append(f'--audio-device={self.audio["device"]}')
+        return args
+    
+    def effective_volume(self):
+        """Volume actually sent to MPV after muting and ducking"""
+        if self.audio['mode'] == 'mute':
+            return 0
+        if self.audio['mode'] == 'duck' and self.ducked:
+            return min(self.volume, self.audio['duck_level'])
+        return self.volume
+    
+    def set_audio(self, policy):
+        """
+        Change the audio policy at runtime
+        
+        Args:
+            policy: Dict with any of mode ('on', 'mute', 'duck'), device
+                    (MPV audio device name, None for default) and duck_level (0-100)
+        """
+        previous = self.audio.copy()
+        self.audio.update(policy)
+        self.audio['duck_level'] = max(0, min(100, int(self.audio['duck_level'])))
+        
+        if not self.is_running():
+            return True
+        
+        ok = True
+        if self.audio['mode'] == 'mute' and previous['mode'] != 'mute':
+            # Deselect the audio track: MPV stops decoding audio and closes its output
+            ok = self._set_property('aid', 'no')
+        elif self.audio['mode'] != 'mute' and previous['mode'] == 'mute':
+            ok = self._set_property('aid', 'auto')
+        
+        if self.audio['device'] != previous['device']:
+            ok = self._set_property('audio-device', self.audio['device'] or 'auto') and ok
+        
+        if self.audio['mode'] != 'mute':
+            ok = self._set_property('volume', self.effective_volume()) and ok
+        return ok
+    
+    def set_ducked(self, ducked):
+        """Duck or restore this zone's volume (only affects 'duck' mode)"""
+        if ducked == self.ducked:
+            return
+        self.ducked = ducked
+        if self.audio['mode'] == 'duck' and self.is_running():
+            print(f"[Zone {self.zone_id}] {'Ducking' if ducked else 'Restoring'} audio")
+            self._set_property('volume', self.effective_volume())
+    
+    def is_audible(self):
+        """True if this zone is currently playing sound"""
+        return self.is_running() and not self.is_paused and self.audio['mode'] != 'mute'
+    
+    def _video_output_args(self):
+        """Video output flags for the zone's output binding"""
+        g = self.geometry
+        
+        if not self.output:
+            return [
+                # X11 video output
+                '--vo=gpu',
+                '--gpu-context=x11egl',
+                
+                # Window geometry (position and size)
+                f'--geometry={g["width"]}x{g["height"]}+{g["x"]}+{g["y"]}',
+                '--autofit-larger=100%x100%',
+            ]
+        
+        output = self.output
+        args = [
+            # Headless DRM/KMS output straight to the connector
+            '--vo=gpu',
+            '--gpu-context=drm',
+            f'--drm-connector={output["connector"]}',
+            f'--drm-mode={output.get("mode") or "preferred"}',
+        ]
+        
+        # Open the card the connector belongs to, not whichever card mpv finds first
+        if output.get('card'):
+            args.append(f'--drm-device=/dev/dri/{output["card"]}')
+        
+        # Plane used for GPU rendering (OSD / scaled video)
+        if output.get('draw_plane'):
+            args.append(f'--drm-draw-plane={output["draw_plane"]}')
+        
+        # Plane the decoded DRM-prime frames are scanned out on directly,
+        # bypassing GPU composition
+        if output.get('video_plane'):
+            args.append(f'--drm-drmprime-video-plane={output["video_plane"]}')
+            if output.get('zero_copy'):
+                args.append('--hwdec-interop=drmprime-overlay')
+        
+        # There is no window under DRM: place the zone inside the connector's
+        # mode with video margins instead
+        for name, value in self._drm_margins().items():
+            args.append(f'--{name}={value:.4f}')
+        
+        return args
+    
+    def _drm_margins(self):
+        """Video margin ratios that position the zone geometry on its DRM connector"""
+        g = self.geometry
+        width, height = self.output['width'], self.output['height']
+        if not (width and height and g['width'] and g['height']):
+            return {}
+        
+        def ratio(value, total):
+            return max(0.0, min(1.0, value / total))
+        
+        return {
+            'video-margin-ratio-left': ratio(g['x'], width),
+            'video-margin-ratio-top': ratio(g['y'], height),
+            'video-margin-ratio-right': ratio(width - g['x'] - g['width'], width),
+            'video-margin-ratio-bottom': ratio(height - g['y'] - g['height'], height),
+        }
+    
+    def set_output(self, output):
+        """
+        Bind the zone to an output and restart playback if running
+        
+        Args:
+            output: None for X11, or dict with connector (e.g. 'HDMI-A-2'),
+                    mode ('1920x1080@60', default 'preferred'), width/height of
+                    the mode, draw_plane / video_plane ('primary', 'overlay' or
+                    a plane index) and zero_copy (DRM-prime hwdec)
+        """
+        self.output = output.copy() if output else None
+        
+        if self.is_running() and self.current_source:
+            return self.restart()
+        return True
+    
+    def restart(self, geometry=None):
+        """
+        Restart the running source (new geometry or output), keeping its
+        position and pause state
+        
+        A governor rendition is not carried over: the original restarts and
+        the governor switches it down again on its next sample if still needed
+        """
+        source = self.rendition_of or self.current_source
+        paused = self.is_paused
+        # Streams are live, they continue at the live edge
+        position = None if '://' in source else self.get_position()
+        success = self.start(source, geometry, warm=True, start_position=position, paused=paused)
+        if success and position:
+            # Clears --start once playing so later loops begin at 0 again
+            self.wait_for_first_frame()
+        return success
+    
     def stop(self):
         """Stop the MPV instance"""
         if self.process and self.process.poll() is None:
@@ -170,6 +475,58 @@ class MPVInstance:
         self.process = None
         self.current_source = None
         self.is_paused = False
+        self.suspended_source = None
+        self.suspend_reason = None
+        self.playlist = None
+        self.rendition_of = None
+    
+    def suspend(self, reason):
+        """Stop decoding but keep the source so playback can resume later"""
+        # Keep the original, the governor picks a rendition again after resuming
+        source = self.rendition_of or self.current_source or self.suspended_source
+        playlist = self.playlist
+        if self.is_running():
+            print(f"[Zone {self.zone_id}] Suspending playback ({reason})")
+        self.stop()
+        self.suspended_source = source
+        self.suspend_reason = reason if source else None
+        self.playlist = playlist
+        return True
+    
+    def start_playlist(self, entries, geometry=None, loop=None):
+        """
+        Start a playlist of still images (slideshow)
+        
+        Args:
+            entries: List of dicts with path and duration (seconds on screen)
+            geometry: Dict with x, y, width, height
+            loop: Boolean for loop playback
+        """
+        first = entries[0]
+        success = self.start(first['path'], geometry, loop=loop, image_duration=first['duration'])
+        self.playlist = [first]
+        if success and len(entries) > 1:
+            self.append_to_playlist(entries[1:])
+        return success
+    
+    def append_to_playlist(self, entries):
+        """Append slideshow entries, each with its own display duration"""
+        if self.playlist is None:
+            return False
+        self.playlist.extend(entries)
+        if not self.is_running():
+            return True
+        
+        ok = True
+        for entry in entries:
+            reply = self._request({
+                'name': 'loadfile',
+                'url': entry['path'],
+                'flags': 'append',
+                'options': f'image-display-duration={entry["duration"]}'
+            })
+            ok = ok and reply is not None and reply.get('error') == 'success'
+        return ok
     
     def pause(self):
         """Pause playback"""
@@ -186,11 +543,40 @@ class MPVInstance:
             return True
         return False
     
+    def seek_to(self, position, flags='absolute+exact'):
+        """
+        Seek to an absolute position and wait until playback has restarted there
+        
+        Args:
+            position: Target position in seconds
+            flags: MPV seek flags, 'absolute+keyframes', 'absolute+exact' or
+                   'absolute' (precise by default, see --hr-seek)
+            
+        Returns:
+            Dict with the measured seek time, False if the seek failed
+        """
+        if not self.is_running():
+            return False
+        
+        started = time.monotonic()
+        reply = self._request(['seek', position, flags], timeout=5, until_event='playback-restart')
+        if not reply or reply.get('error') != 'success':
+            return False
+        
+        self.last_seek = {
+            'position': position,
+            'flags': flags,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+        print(f"[Zone {self.zone_id}] Seek to {position}s ({flags}) took {self.last_seek['elapsed_ms']} ms")
+        return self.last_seek
+    
     def set_volume(self, volume):
         """Set volume (0-100)"""
         if self.is_running():
             self.volume = max(0, min(100, volume))
-            self._send_command(f'set volume {self.volume}')
+            if self.audio['mode'] != 'mute':
+                self._send_command(f'set volume {self.effective_volume()}')
             return True
         return False
     
@@ -199,17 +585,138 @@ class MPVInstance:
         Update geometry and restart playback with new position/size
         Note: DRM mode requires restart to change geometry
         """
-        if self.is_running() and self.current_source:
-            source = self.current_source
+        if self.playlist and (self.is_running() or self.suspended_source):
+            # Restart the slideshow with the frames prepared so far
+            return self.start_playlist(list(self.playlist), geometry)
+        elif self.is_running() and self.current_source:
             self.geometry.update(geometry)
             # Restart with new geometry
-            return self.start(source, geometry)
+            return self.restart(geometry)
+        elif self.suspended_source:
+            # Resume a suspended zone (stays suspended if still zero-sized)
+            return self.start(self.suspended_source, geometry)
         elif not self.is_running():
             # Just update geometry for next start
             self.geometry.update(geometry)
             return True
         return False
     
+    def apply_live_geometry(self, geometry):
+        """
+        Move/resize the running window in place via IPC (no restart)
+        Used for live preview while zones are dragged on the layout canvas
+        
+        Returns:
+            True if MPV accepted the new geometry
+        """
+        self.geometry.update(geometry)
+        if not self.is_running():
+            return False
+        
+        g = self.geometry
+        if self.output:
+            # DRM output: move the video inside the connector via its margins
+            replies = [self._request(['set_property', name, value])
+                       for name, value in self._drm_margins().items()]
+        elif self.get_mpv_version() < LIVE_GEOMETRY_MIN_VERSION:
+            # The reply would be success without the window moving; let the commit restart MPV
+            self.live_geometry_applied = False
+            return False
+        else:
+            replies = [self._request(['set_property', 'geometry', f'{g["width"]}x{g["height"]}+{g["x"]}+{g["y"]}'])]
+        applied = bool(replies) and all(reply is not None and reply.get('error') == 'success' for reply in replies)
+        self.live_geometry_applied = applied
+        return applied
+    
+    def commit_geometry(self):
+        """
+        Make the current geometry permanent after live preview
+        Only restarts MPV if the in-place update was not accepted
+        """
+        if self.is_running() and self.live_geometry_applied:
+            self.live_geometry_applied = False
+            return True
+        return self.update_geometry({})
+    
+    def get_mpv_version(self):
+        """
+        Version of the MPV binary as a tuple, e.g. (0, 38), (0, 0) if unknown
+        """
+        if self.mpv_version is None and self.is_running():
+            reply = self._request(['get_property', 'mpv-version'])
+            if reply and reply.get('error') == 'success':
+                # "mpv 0.35.1", "mpv v0.38.0-dirty", ...
+                match = re.search(r'(\d+)\.(\d+)', str(reply.get('data')))
+                self.mpv_version = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+        return self.mpv_version or (0, 0)
+    
+    def get_position(self):
+        """Current playback position in seconds, or None"""
+        if not self.is_running():
+            return None
+        reply = self._request(['get_property', 'time-pos'])
+        if reply and reply.get('error') == 'success':
+            return reply.get('data')
+        return None
+    
+    def screenshot(self, path):
+        """
+        Write the current video frame (without OSD) to path as a JPEG
+        
+        Returns:
+            True if MPV wrote the file
+        """
+        if not self.is_running():
+            return False
+        reply = self._request(['screenshot-to-file', path, 'video'], timeout=5, asynchronous=True)
+        return reply is not None and reply.get('error') == 'success'
+    
+    def get_frame_drops(self):
+        """
+        Frames dropped by the video output and the decoder since MPV started
+        (MPV only reports these on its terminal status line, so ask over IPC)
+        """
+        if not self.is_running():
+            return None
+        drops = {}
+        for key, prop in (('vo', 'frame-drop-count'), ('decoder', 'decoder-frame-drop-count')):
+            reply = self._request(['get_property', prop])
+            drops[key] = reply.get('data') if reply and reply.get('error') == 'success' else None
+        return drops
+    
+    def wait_for_first_frame(self, timeout=10):
+        """
+        Block until MPV has configured its video output and is playing
+        
+        Returns:
+            True once the first frame is up, False on timeout or exit
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.is_running():
+            reply = self._request(['get_property', 'vo-configured'], timeout=0.5)
+            if reply and reply.get('data') is True and self.get_position() is not None:
+                # --start also applies when a loop wraps around; later loops begin at 0
+                if self.start_position:
+                    self._set_property('start', 'none')
+                return True
+            time.sleep(0.02)
+        return False
+    
+    def get_state(self):
+        """Everything needed to bring this zone back after a power cycle"""
+        return {
+            'source': self.rendition_of or self.current_source or self.suspended_source,
+            'running': self.is_running() or bool(self.suspended_source),
+            'position': self.get_position(),
+            'paused': self.is_paused,
+            'volume': self.volume,
+            'loop': self.loop,
+            'geometry': self.geometry.copy(),
+            'audio': self.audio.copy(),
+            'output': self.output.copy() if self.output else None,
+            'playlist': list(self.playlist) if self.playlist else None
+        }
+    
     def is_running(self):
         """Check if MPV instance is running"""
         return self.process is not None and self.process.poll() is None
@@ -222,8 +729,16 @@ class MPVInstance:
             'source': self.current_source,
             'paused': self.is_paused,
             'volume': self.volume,
+            'audio': dict(self.audio, ducked=self.ducked, effective_volume=self.effective_volume()),
             'geometry': self.geometry.copy(),
-            'loop': self.loop
+            'loop': self.loop,
+            'output': self.output.copy() if self.output else None,
+            'suspended': self.suspend_reason,
+            'slideshow': len(self.playlist) if self.playlist else None,
+            'suspended_source': self.suspended_source,
+            'last_seek': self.last_seek,
+            'quality': dict(self.quality, rendition_of=self.rendition_of),
+            'log': self.log.get_status()
         }
     
     def _send_command(self, command):
@@ -247,14 +762,74 @@ class MPVInstance:
         except Exception as e:
             print(f"[Zone {self.zone_id}] IPC command failed: {e}")
             return False
+    
+    def _set_property(self, name, value):
+        """Set an MPV property over IPC, True if MPV accepted it"""
+        reply = self._request(['set_property', name, value])
+        return reply is not None and reply.get('error') == 'success'
+    
+    def _request(self, command, timeout=1, until_event=None, asynchronous=False):
+        """
+        Send a JSON IPC command and wait for its reply
+        
+        Args:
+            command: Command as a list, e.g. ['get_property', 'time-pos'],
+                     or a dict of named arguments, e.g. {'name': 'loadfile', ...}
+            until_event: Also wait for this MPV event after a successful reply
+                         (e.g. 'playback-restart' once a seek has completed)
+            asynchronous: Let MPV run the command off its playback thread
+                          (the reply still arrives once it has finished)
+            
+        Returns:
+            Reply dict ({"error": "success", "data": ...}) or None on failure
+        """
+        if not os.path.exists(self.socket_path):
+            return None
+        
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.socket_path)
+                message = {"command": command, "request_id": 1}
+                if asynchronous:
+                    message["async"] = True
+                sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+                
+                # Skip any event messages until our reply arrives
+                buffer = b''
+                reply = None
+                while True:
+                    chunk = sock.recv(4096)
+                    if not chunk:
+                        return None
+                    buffer += chunk
+                    while b'\n' in buffer:
+                        line, buffer = buffer.split(b'\n', 1)
+                        if not line.strip():
+                            continue
+                        message = json.loads(line)
+                        if 'error' in message and message.get('request_id') == 1:
+                            if not until_event or message['error'] != 'success':
+                                return message
+                            reply = message
+                        elif reply and message.get('event') == until_event:
+                            return reply
+                        
+        except Exception as e:
+            print(f"[Zone {self.zone_id}] IPC request failed: {e}")
+            return None
 
 
 class DualZoneManager:
     """Manages two MPV instances for dual-zone playback"""
     
-    def __init__(self):
-        self.zone1 = MPVInstance(zone_id=1, socket_path="/tmp/mpvsocket")
-        self.zone2 = MPVInstance(zone_id=2, socket_path="/tmp/mpvsocket")
+    def __init__(self, cache_budget_mb=256, socket_path="/tmp/mpvsocket", warm_seconds=30, duration_of=None):
+        # Shared page-cache budget, split between the two zones
+        self.warmer = CacheWarmer(budget_bytes=cache_budget_mb * 1024 * 1024, zones=2,
+                                  seconds=warm_seconds, duration_of=duration_of)
+        
+        self.zone1 = MPVInstance(zone_id=1, socket_path=socket_path, warmer=self.warmer)
+        self.zone2 = MPVInstance(zone_id=2, socket_path=socket_path, warmer=self.warmer)
         
         # Default display resolution
         self.display_resolution = {
@@ -262,31 +837,99 @@ class DualZoneManager:
             'height': 1080
         }
         
-    def start_zone(self, zone_id, source, geometry=None, volume=None, loop=None):
+    def start_zone(self, zone_id, source, geometry=None, volume=None, loop=None, warm=False,
+                   start_position=None):
         """Start playback in specified zone"""
         zone = self.zone1 if zone_id == 1 else self.zone2
-        return zone.start(source, geometry, volume, loop)
+        # Start already ducked if the other zone is playing sound
+        zone.ducked = self._other_zone(zone_id).is_audible()
+        success = zone.start(source, geometry, volume, loop, warm, start_position=start_position)
+        self.update_ducking()
+        return success
+    
+    def start_zone_playlist(self, zone_id, entries, geometry=None, loop=None):
+        """Start a still-image playlist (slideshow) in specified zone"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        success = zone.start_playlist(entries, geometry, loop)
+        self.update_ducking()
+        return success
+    
+    def append_zone_playlist(self, zone_id, entries):
+        """Append prepared frames to a zone's slideshow"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        return zone.append_to_playlist(entries)
+    
+    def playlist_paths(self):
+        """Frame paths in the slideshow playlists of both zones (playing or suspended)"""
+        return {entry['path'] for zone in (self.zone1, self.zone2) for entry in (zone.playlist or [])}
     
     def stop_zone(self, zone_id):
         """Stop playback in specified zone"""
         zone = self.zone1 if zone_id == 1 else self.zone2
         zone.stop()
+        self.warmer.release(zone_id)
+        self.update_ducking()
     
     def stop_all(self):
         """Stop all zones (screen goes black)"""
         self.zone1.stop()
         self.zone2.stop()
+        self.warmer.release(1)
+        self.warmer.release(2)
+        self.update_ducking()
     
     def pause_zone(self, zone_id):
         """Pause/unpause specified zone"""
         zone = self.zone1 if zone_id == 1 else self.zone2
-        return zone.pause()
+        paused = zone.pause()
+        self.update_ducking()
+        return paused
+    
+    def set_zone_audio(self, zone_id, policy):
+        """Change a zone's audio policy (mode, device, duck_level)"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        success = zone.set_audio(policy)
+        self.update_ducking()
+        return success
+    
+    def update_ducking(self):
+        """Duck zones in 'duck' mode while the other zone is audible"""
+        for zone in (self.zone1, self.zone2):
+            zone.set_ducked(self._other_zone(zone.zone_id).is_audible())
+    
+    def list_audio_devices(self):
+        """List audio output devices as reported by MPV"""
+        try:
+            result = subprocess.run(['mpv', '--audio-device=help'],
+                                    capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Could not list audio devices: {e}")
+            return []
+        
+        # Lines look like:  'alsa/hdmi:CARD=vc4hdmi0,DEV=0' (vc4-hdmi-0, MAI PCM i2s-hifi-0)
+        devices = []
+        for match in re.finditer(r"^\s*'([^']+)'\s*\((.*)\)\s*$", result.stdout, re.MULTILINE):
+            devices.append({'name': match.group(1), 'description': match.group(2)})
+        return devices
+    
+    def _other_zone(self, zone_id):
+        return self.zone2 if zone_id == 1 else self.zone1
     
     def seek_zone(self, zone_id, seconds):
         """Seek in specified zone"""
         zone = self.zone1 if zone_id == 1 else self.zone2
         return zone.seek(seconds)
     
+    def seek_zone_to(self, zone_id, position, flags='absolute+exact'):
+        """Seek to an absolute position in specified zone"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        return zone.seek_to(position, flags)
+    
+    def set_zone_quality(self, zone_id, quality, rendition=None):
+        """Apply quality governor settings to specified zone"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        return zone.set_quality(quality, rendition)
+    
     def set_zone_volume(self, zone_id, volume):
         """Set volume for specified zone"""
         zone = self.zone1 if zone_id == 1 else self.zone2
@@ -297,6 +940,203 @@ class DualZoneManager:
         zone = self.zone1 if zone_id == 1 else self.zone2
         return zone.update_geometry(geometry)
     
+    def apply_live_zone_geometry(self, zone_id, geometry):
+        """Apply geometry in place for live preview"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        return zone.apply_live_geometry(geometry)
+    
+    def commit_zone_geometry(self, zone_id):
+        """Make a live-previewed geometry permanent"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        return zone.commit_geometry()
+    
+    def set_zone_output(self, zone_id, output):
+        """
+        Bind a zone to a DRM connector (or back to X11 with output=None)
+        
+        Raises:
+            ValueError: If the output is invalid or the connector is taken
+        """
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        if output:
+            output = self.resolve_output(zone_id, output)
+        return zone.set_output(output)
+    
+    def resolve_output(self, zone_id, output):
+        """
+        Validate an output binding for a zone and fill in the mode's resolution
+        
+        Only one process can be DRM master of a card, and each zone runs its
+        own MPV process. A zone can therefore only use DRM output while no X
+        server is running, and the two zones can't share a card - on the
+        Pi 5 both HDMI ports belong to one display card.
+        
+        Raises:
+            ValueError: If the output is invalid or the card is already driven
+        """
+        connector = output.get('connector')
+        if not connector:
+            raise ValueError("Missing connector")
+        
+        known = {c['name']: c for c in self.list_outputs()}
+        if known and connector not in known:
+            raise ValueError(f"Unknown connector: {connector}")
+        card = known.get(connector, {}).get('card')
+        
+        if x_server_running():
+            raise ValueError("An X server is running and holds DRM master; "
+                             "stop the desktop to use DRM output")
+        
+        other = self.zone2 if zone_id == 1 else self.zone1
+        if other.output:
+            if other.output['connector'] == connector:
+                raise ValueError(f"Connector {connector} is already used by zone {other.zone_id}")
+            if other.output.get('card') == card:
+                raise ValueError(f"Zone {other.zone_id} already drives {card} as DRM master; "
+                                 f"both zones can't use connectors on the same card")
+        
+        for key in ('draw_plane', 'video_plane'):
+            plane = output.get(key)
+            if plane is not None and str(plane) not in ('primary', 'overlay') and not str(plane).isdigit():
+                raise ValueError(f"Invalid {key}: {plane}")
+        
+        resolved = {
+            'connector': connector,
+            'card': card,
+            'mode': output.get('mode') or 'preferred',
+            'draw_plane': output.get('draw_plane'),
+            'video_plane': output.get('video_plane'),
+            'zero_copy': bool(output.get('zero_copy', True)),
+            'width': None,
+            'height': None
+        }
+        
+        # Resolution of the mode, used to place the zone on the connector
+        mode = resolved['mode']
+        if mode == 'preferred' and known.get(connector, {}).get('modes'):
+            mode = known[connector]['modes'][0]
+        size = mode.split('@')[0]
+        if 'x' in size:
+            width, height = size.split('x', 1)
+            if width.isdigit() and height.isdigit():
+                resolved['width'], resolved['height'] = int(width), int(height)
+        if not resolved['width']:
+            resolved['width'] = self.display_resolution['width']
+            resolved['height'] = self.display_resolution['height']
+        
+        return resolved
+    
+    def list_outputs(self):
+        """List DRM connectors with their status and supported modes"""
+        outputs = []
+        for path in sorted(glob.glob('/sys/class/drm/card*-*')):
+            # card1-HDMI-A-2 -> HDMI-A-2
+            name = os.path.basename(path).split('-', 1)[1]
+            try:
+                with open(os.path.join(path, 'status')) as f:
+                    status = f.read().strip()
+                with open(os.path.join(path, 'modes')) as f:
+                    modes = [line.strip() for line in f if line.strip()]
+            except OSError:
+                continue
+            
+            outputs.append({
+                'name': name,
+                'card': os.path.basename(path).split('-', 1)[0],
+                'status': status,
+                'modes': modes,
+                'zones': [zone.zone_id for zone in (self.zone1, self.zone2)
+                          if zone.output and zone.output['connector'] == name]
+            })
+        return outputs
+    
+    def get_zone_display(self, zone_id):
+        """Resolution a zone's geometry is relative to (its connector's mode under DRM)"""
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        if zone.output and zone.output.get('width'):
+            return {'width': zone.output['width'], 'height': zone.output['height']}
+        return self.display_resolution.copy()
+    
+    def analyze_layout(self, geometries=None):
+        """
+        Work out which zones need decoding
+        
+        Args:
+            geometries: Optional dict of zone_id -> geometry overriding the
+                        zones' current geometry (e.g. a preset about to load)
+        
+        Returns:
+            Dict of zone_id -> analysis (area, visible_area, decode, skip_reason)
+        """
+        geometries = geometries or {}
+        zones = {}
+        for zone in (self.zone1, self.zone2):
+            g = zone.geometry.copy()
+            g.update(geometries.get(zone.zone_id) or {})
+            zones[zone.zone_id] = g
+        
+        connector1 = self.zone1.output['connector'] if self.zone1.output else None
+        connector2 = self.zone2.output['connector'] if self.zone2.output else None
+        
+        if connector1 == connector2:
+            # Same screen: zone 2 is stacked above zone 1 and can hide it
+            result = analyze_layout({'zone1': zones[1], 'zone2': zones[2]}, self.get_zone_display(1))
+            return {1: result['zones']['zone1'], 2: result['zones']['zone2']}
+        
+        # Different connectors can't occlude each other
+        return {
+            zone_id: analyze_layout({'zone1': zones[zone_id]}, self.get_zone_display(zone_id))['zones']['zone1']
+            for zone_id in (1, 2)
+        }
+    
+    def apply_zone_layout(self, zone_id, geometry, decode=True, reason=None):
+        """
+        Apply geometry to a zone, suspending it if it does not need decoding
+        
+        Args:
+            zone_id: Zone to update
+            geometry: New geometry (None keeps the current one)
+            decode: False to suspend the zone (hidden or zero-sized)
+            reason: Why the zone is not decoded
+        """
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        if decode:
+            if geometry is None and zone.is_running():
+                # Already visible and decoding, nothing to restart
+                return True
+            if zone.live_geometry_applied and all(zone.geometry.get(k) == v for k, v in (geometry or {}).items()):
+                # Already moved there in place by the live preview
+                return zone.commit_geometry()
+            return zone.update_geometry(geometry or {})
+        
+        zone.geometry.update(geometry or {})
+        if zone.is_running() or zone.suspended_source:
+            return zone.suspend(reason or 'hidden')
+        return True
+    
+    def get_state(self):
+        """Snapshot of both zones for the state journal"""
+        return {
+            'display_resolution': self.display_resolution.copy(),
+            'zones': {
+                'zone1': self.zone1.get_state(),
+                'zone2': self.zone2.get_state()
+            }
+        }
+    
+    def get_zone_logs(self, zone_id, **filters):
+        """
+        Buffered MPV messages for a zone with counters and frame drops
+        
+        Args:
+            filters: Passed to ZoneLog.query (level, category, module, contains, since, limit)
+        """
+        zone = self.zone1 if zone_id == 1 else self.zone2
+        status = zone.log.get_status()
+        status['counters']['frame_drops'] = zone.get_frame_drops()
+        status['entries'] = zone.log.query(**filters)
+        return status
+    
     def get_zone_status(self, zone_id):
         """Get status of specified zone"""
         zone = self.zone1 if zone_id == 1 else self.zone2
@@ -307,7 +1147,8 @@ class DualZoneManager:
         return {
             'zone1': self.zone1.get_status(),
             'zone2': self.zone2.get_status(),
-            'display': self.display_resolution.copy()
+            'display': self.display_resolution.copy(),
+            'cache': self.warmer.get_status()
         }
     
     def set_display_resolution(self, width, height):
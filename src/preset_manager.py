@@ -9,6 +9,11 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from layout import normalize_geometry, normalize_display, validate_geometry, scale_geometry, snap_to_grid, analyze_layout
+
+# Resolution presets are validated against when none is given
+DEFAULT_DISPLAY_RESOLUTION = {'width': 1920, 'height': 1080}
+
 
 class PresetManager:
     """Manages geometry presets for dual-zone configurations"""
@@ -48,7 +53,8 @@ class PresetManager:
             print(f"❌ Error saving presets: {e}")
             return False
     
-    def save_preset(self, name, zone1_geometry, zone2_geometry, description=""):
+    def save_preset(self, name, zone1_geometry, zone2_geometry, description="",
+                    display_resolution=None, grid=None):
         """
         Save a new preset configuration
         
@@ -57,32 +63,85 @@ class PresetManager:
             zone1_geometry: Dict with x, y, width, height for zone 1
             zone2_geometry: Dict with x, y, width, height for zone 2
             description: Optional description of the preset
+            display_resolution: Dict with width, height the geometries are meant for
+            grid: Optional dict with LED cabinet width, height to snap zones to
+            
+        Raises:
+            ValueError: If the display resolution is invalid, or a geometry is
+                        invalid for it
         """
+        display = normalize_display(display_resolution or DEFAULT_DISPLAY_RESOLUTION)
+        
+        zones = {'zone1': zone1_geometry, 'zone2': zone2_geometry}
+        for zone_name, geometry in zones.items():
+            try:
+                if grid:
+                    geometry = snap_to_grid(geometry, grid, display)
+                zones[zone_name] = validate_geometry(geometry, display)
+            except ValueError as e:
+                raise ValueError(f"{zone_name}: {e}")
+        
         preset = {
             'name': name,
             'description': description,
             'created': datetime.now().isoformat(),
-            'zone1': zone1_geometry.copy(),
-            'zone2': zone2_geometry.copy()
+            'display_resolution': display,
+            'zone1': zones['zone1'],
+            'zone2': zones['zone2']
         }
+        if grid:
+            preset['grid'] = dict(grid)
         
         self.presets[name] = preset
         self.save_presets()
         return True
     
-    def load_preset(self, name):
+    def load_preset(self, name, display_resolution=None, current=None):
         """
         Load a preset by name
         
+        Args:
+            name: Preset name
+            display_resolution: Current display resolution; geometries saved
+                                for a different resolution are scaled to it
+            current: Optional dict of zone name -> current geometry, filling in
+                     keys missing from presets saved before geometries were
+                     validated (such presets only changed the keys they had)
+        
         Returns:
             Dict with zone1 and zone2 geometry, or None if not found
+        
+        Raises:
+            ValueError: If a stored geometry can't be completed or isn't numeric
         """
         if name in self.presets:
             preset = self.presets[name]
+            current = current or {}
+            zones = {}
+            for zone_name in ('zone1', 'zone2'):
+                geometry = dict(current.get(zone_name) or {'x': 0, 'y': 0, 'width': 0, 'height': 0})
+                geometry.update(preset.get(zone_name) or {})
+                try:
+                    zones[zone_name] = normalize_geometry(geometry)
+                except ValueError as e:
+                    raise ValueError(f"Preset {name}, {zone_name}: {e}")
+            zone1 = zones['zone1']
+            zone2 = zones['zone2']
+            
+            saved_for = preset.get('display_resolution')
+            if display_resolution and saved_for and saved_for != display_resolution:
+                zone1 = scale_geometry(zone1, saved_for, display_resolution)
+                zone2 = scale_geometry(zone2, saved_for, display_resolution)
+                print(f"Scaled preset {name} from {saved_for['width']}x{saved_for['height']} "
+                      f"to {display_resolution['width']}x{display_resolution['height']}")
+            
+            display = display_resolution or saved_for or DEFAULT_DISPLAY_RESOLUTION
             return {
-                'zone1': preset['zone1'].copy(),
-                'zone2': preset['zone2'].copy(),
-                'description': preset.get('description', '')
+                'zone1': zone1,
+                'zone2': zone2,
+                'description': preset.get('description', ''),
+                'display_resolution': dict(display),
+                'layout': analyze_layout({'zone1': zone1, 'zone2': zone2}, display)
             }
         return None
     
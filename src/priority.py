@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Priority - Keep background work (frame decoding, probing, snapshots) away
+from playback by running it at a lower CPU priority
+"""
+
+import os
+
+
+BACKGROUND_NICENESS = 10
+
+
+def lower_priority():
+    """
+    Lower the CPU priority of the calling thread or process
+
+    Linux applies nice() per thread, so this works both as a thread pool
+    initializer and as a subprocess preexec_fn
+    """
+    try:
+        os.nice(BACKGROUND_NICENESS)
+    except OSError:
+        pass
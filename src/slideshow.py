@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Slideshow - Still-image and slideshow zones with a decoded-frame cache
+Images are decoded and scaled to the zone size ahead of display time in a
+low-priority background pool, so MPV only has to show ready-made frames
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from priority import lower_priority
+
+try:
+    from PIL import Image
+except ImportError:
+    # Without Pillow MPV decodes and scales the original images itself
+    Image = None
+
+
+IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
+
+CROSSFADE_STEPS = 8  # Blended frames per crossfade
+
+
+def is_image(path):
+    """Check if a path is a still image MPV can show in a zone"""
+    return '.' in path and path.rsplit('.', 1)[1].lower() in IMAGE_EXTENSIONS
+
+
+class FrameCache:
+    """
+    Disk cache of decoded frames scaled to a zone size
+
+    Frames are stored as high-quality JPEGs already at the zone size: MPV
+    only decodes a small baseline JPEG at display time, while the expensive
+    work (decoding large originals, scaling, blending) happens ahead of time.
+    Compared to uncompressed frames this keeps SD card writes and the cache
+    size down by roughly an order of magnitude.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, workers=2, quality=92, protect=None):
+        """
+        Args:
+            cache_dir: Directory the frames are written to
+            max_bytes: Size the cache is trimmed back to
+            workers: Concurrent decodes
+            quality: JPEG quality of the stored frames
+            protect: Optional callable returning the frame paths zones are
+                     currently showing, which are never evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.protect = protect
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='frame-cache',
+                                           initializer=lower_priority)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def available(self):
+        return Image is not None
+
+    def frame(self, path, size):
+        """
+        Queue decoding of an image scaled to size (width, height)
+
+        Returns:
+            Future resolving to the cached frame path (or the original path
+            when Pillow is not installed)
+        """
+        return self._submit(('frame', path, size), self._render_frame, path, size)
+
+    def blend(self, path_a, path_b, size, alpha):
+        """Queue a crossfade frame between two images at the given alpha (0-1)"""
+        return self._submit(('blend', path_a, path_b, size, round(alpha, 3)),
+                            self._render_blend, path_a, path_b, size, alpha)
+
+    def get_status(self):
+        files = self._cached_files()
+        return {
+            'enabled': self.available(),
+            'cache_dir': self.cache_dir,
+            'frames': len(files),
+            'bytes': sum(size for _, size, _ in files),
+            'max_bytes': self.max_bytes,
+            'pending': len(self.pending)
+        }
+
+    def _submit(self, key, func, *args):
+        with self.lock:
+            future = self.pending.get(key)
+            if future is not None:
+                return future
+            future = self.executor.submit(func, *args)
+            self.pending[key] = future
+        # Outside the lock: the callback runs immediately if the work is already done
+        future.add_done_callback(lambda _: self._done(key))
+        return future
+
+    def _done(self, key):
+        with self.lock:
+            self.pending.pop(key, None)
+
+    def _cache_path(self, key, size):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}-{size[0]}x{size[1]}.jpg")
+
+    def _source_key(self, path):
+        # Include mtime so replaced images are decoded again
+        return (path, os.path.getmtime(path))
+
+    def _load_scaled(self, path, size):
+        with Image.open(path) as image:
+            # Decode at reduced resolution where the format supports it (JPEG)
+            image.draft('RGB', size)
+            return image.convert('RGB').resize(size, Image.LANCZOS)
+
+    def _render_frame(self, path, size):
+        if Image is None:
+            return path
+        target = self._cache_path(('frame', self._source_key(path)), size)
+        if not os.path.exists(target):
+            self._store(self._load_scaled(path, size), target)
+        else:
+            os.utime(target)
+        return target
+
+    def _render_blend(self, path_a, path_b, size, alpha):
+        if Image is None:
+            return path_b
+        key = ('blend', self._source_key(path_a), self._source_key(path_b), round(alpha, 3))
+        target = self._cache_path(key, size)
+        if not os.path.exists(target):
+            with Image.open(self._render_frame(path_a, size)) as frame_a, \
+                    Image.open(self._render_frame(path_b, size)) as frame_b:
+                blended = Image.blend(frame_a.convert('RGB'), frame_b.convert('RGB'), alpha)
+            self._store(blended, target)
+        else:
+            os.utime(target)
+        return target
+
+    def _store(self, image, target):
+        tmp = f"{target}.tmp"
+        image.save(tmp, format='JPEG', quality=self.quality)
+        os.replace(tmp, target)
+        self._evict()
+
+    def _cached_files(self):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.jpg'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _evict(self):
+        """Drop least recently used frames once over budget, except those on screen"""
+        files = sorted(self._cached_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return
+        # A playing (or suspended) slideshow reads its frames again on every loop
+        protected = set(self.protect()) if self.protect else set()
+        for path, size, _ in files:
+            if total <= self.max_bytes:
+                break
+            if path in protected:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class Slideshow:
+    """Builds a zone playlist of prepared frames and feeds it to MPV ahead of display time"""
+
+    def __init__(self, zone_manager, frame_cache, dispatcher):
+        self.zone_manager = zone_manager
+        self.frame_cache = frame_cache
+        self.dispatcher = dispatcher
+        self.generation = {}
+        self.lock = threading.Lock()
+
+    def start(self, zone_id, images, duration=10, crossfade=0.0, geometry=None, loop=True):
+        """
+        Start a slideshow in a zone
+
+        Args:
+            zone_id: Zone to play in
+            images: List of image paths
+            duration: Seconds each image is shown
+            crossfade: Crossfade length in seconds (needs Pillow, 0 to disable)
+            geometry: Optional zone geometry
+            loop: Loop the slideshow
+
+        Returns:
+            True if playback started
+        """
+        zone = self.zone_manager.zone1 if zone_id == 1 else self.zone_manager.zone2
+        g = dict(zone.geometry, **(geometry or {}))
+        size = (max(1, g['width']), max(1, g['height']))
+
+        if not self.frame_cache.available():
+            crossfade = 0.0
+        crossfade = min(crossfade, duration / 2) if len(images) > 1 else 0.0
+
+        # Queue every decode up front; the pool works through them in display order
+        entries = []
+        count = len(images)
+        for index, path in enumerate(images):
+            entries.append((self.frame_cache.frame(path, size), duration - crossfade))
+            if crossfade and (loop or index < count - 1):
+                following = images[(index + 1) % count]
+                step = crossfade / CROSSFADE_STEPS
+                for i in range(1, CROSSFADE_STEPS + 1):
+                    entries.append((self.frame_cache.blend(path, following, size, i / (CROSSFADE_STEPS + 1)), step))
+
+        with self.lock:
+            generation = self.generation.get(zone_id, 0) + 1
+            self.generation[zone_id] = generation
+
+        # Only the first frame has to be ready before MPV starts
+        first_future, first_duration = entries[0]
+        first = {'path': first_future.result(), 'duration': first_duration}
+        if not self.zone_manager.start_zone_playlist(zone_id, [first], geometry, loop):
+            return False
+
+        thread = threading.Thread(target=self._feed, args=(zone_id, generation, entries[1:]),
+                                  name=f"zone{zone_id}-slideshow", daemon=True)
+        thread.start()
+        return True
+
+    def stop(self, zone_id):
+        """Stop feeding a zone's slideshow (the zone itself is stopped separately)"""
+        with self.lock:
+            self.generation[zone_id] = self.generation.get(zone_id, 0) + 1
+
+    def _feed(self, zone_id, generation, entries):
+        """Append frames to the zone playlist in order as soon as they are decoded"""
+        for future, duration in entries:
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"[Zone {zone_id}] Slideshow frame failed: {e}")
+                continue
+            if not self._current(zone_id, generation):
+                return
+            # On the zone's worker, so appends never interleave with a restart of the playlist
+            self.dispatcher.submit(zone_id, 'slideshow_append', self._append,
+                                   zone_id, generation, [{'path': path, 'duration': duration}],
+                                   coalesce=('slideshow_append',), merge=self._merge_appends)
+
+    def _current(self, zone_id, generation):
+        with self.lock:
+            return self.generation.get(zone_id) == generation
+
+    def _append(self, zone_id, generation, entries):
+        # A slideshow started or stopped after this was queued owns the playlist now
+        if not self._current(zone_id, generation):
+            return False
+        return self.zone_manager.append_zone_playlist(zone_id, entries)
+
+    @staticmethod
+    def _merge_appends(queued, operation):
+        zone_id, generation, entries = operation.args
+        if queued.args[1] == generation:
+            operation.args = (zone_id, generation, queued.args[2] + entries)
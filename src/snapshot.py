@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Snapshot - Low-resolution preview frames of what each zone is showing
+Frames are captured with MPV's screenshot-to-file, scaled down off the
+playback path and cached for a short TTL. Concurrent requests for the same
+zone share one capture, and captures run one at a time, so dashboards
+polling many walls never compete with decoding.
+"""
+
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from priority import lower_priority
+
+try:
+    from PIL import Image
+except ImportError:
+    # Without Pillow the full-resolution JPEG from MPV is served as is
+    Image = None
+
+
+class SnapshotService:
+    """TTL-cached, single-flight zone snapshots"""
+
+    def __init__(self, zone_manager, snapshot_dir, ttl=2.0, width=480, quality=70,
+                 max_concurrent=1, max_streams=4, timeout=5):
+        """
+        Args:
+            zone_manager: DualZoneManager whose zones are captured
+            snapshot_dir: Directory MPV writes screenshots to (ideally tmpfs)
+            ttl: Seconds a snapshot is served from cache
+            width: Width previews are scaled down to
+            quality: JPEG quality of the previews
+            max_concurrent: Captures running at the same time
+            max_streams: Concurrent MJPEG preview streams
+            timeout: Seconds to wait for a capture
+        """
+        self.zone_manager = zone_manager
+        self.snapshot_dir = snapshot_dir
+        self.ttl = ttl
+        self.width = width
+        self.quality = quality
+        self.max_streams = max_streams
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.cache = {}      # zone_id -> snapshot dict
+        self.inflight = {}   # zone_id -> Future of the running capture
+        self.streams = 0
+        self.stats = {'captures': 0, 'cache_hits': 0, 'shared': 0, 'failures': 0}
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='snapshot',
+                                           initializer=lower_priority)
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    def get(self, zone_id):
+        """
+        Latest snapshot of a zone, capturing a new one if the cached one expired
+
+        Returns:
+            Dict with image (JPEG bytes), width, height and captured (Unix time),
+            or None if the zone is not playing or the capture failed
+        """
+        with self.lock:
+            cached = self.cache.get(zone_id)
+            if cached and time.monotonic() - cached['monotonic'] < self.ttl:
+                self.stats['cache_hits'] += 1
+                return cached
+            future = self.inflight.get(zone_id)
+            if future is not None:
+                # Someone is already capturing this zone, wait for their result
+                self.stats['shared'] += 1
+            else:
+                future = self.executor.submit(self._capture, zone_id)
+                self.inflight[zone_id] = future
+
+        try:
+            return future.result(timeout=self.timeout)
+        except Exception as e:
+            print(f"[Zone {zone_id}] Snapshot failed: {e}")
+            return None
+
+    def open_stream(self):
+        """Reserve one of the MJPEG stream slots, False if all are taken"""
+        with self.lock:
+            if self.streams >= self.max_streams:
+                return False
+            self.streams += 1
+            return True
+
+    def close_stream(self):
+        with self.lock:
+            self.streams = max(0, self.streams - 1)
+
+    def get_status(self):
+        with self.lock:
+            return dict(self.stats,
+                        ttl=self.ttl,
+                        width=self.width,
+                        scaling=Image is not None,
+                        streams=self.streams,
+                        max_streams=self.max_streams)
+
+    def _capture(self, zone_id):
+        try:
+            zone = self.zone_manager.zone1 if zone_id == 1 else self.zone_manager.zone2
+            path = os.path.join(self.snapshot_dir, f"zone{zone_id}.jpg")
+            if not zone.screenshot(path):
+                with self.lock:
+                    self.stats['failures'] += 1
+                return None
+
+            snapshot = self._scale(path)
+            snapshot['captured'] = time.time()
+            snapshot['monotonic'] = time.monotonic()
+            with self.lock:
+                self.cache[zone_id] = snapshot
+                self.stats['captures'] += 1
+            return snapshot
+        finally:
+            with self.lock:
+                self.inflight.pop(zone_id, None)
+
+    def _scale(self, path):
+        if Image is None:
+            with open(path, 'rb') as f:
+                return {'image': f.read(), 'width': None, 'height': None}
+
+        with Image.open(path) as image:
+            height = max(1, round(image.height * self.width / image.width))
+            # JPEG draft mode decodes straight at (roughly) the target size
+            image.draft('RGB', (self.width, height))
+            preview = image.convert('RGB').resize((self.width, height), Image.BILINEAR)
+        buffer = io.BytesIO()
+        preview.save(buffer, format='JPEG', quality=self.quality)
+        return {'image': buffer.getvalue(), 'width': self.width, 'height': height}
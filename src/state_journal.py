@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+State Journal - Persist what is on screen and bring it back at boot
+The active preset, sources, geometries, volumes and audio/output settings are
+journaled when they change, and playback positions on a long interval and at
+shutdown, so a power cycle returns to the same picture without anyone
+touching the API and without rewriting the SD card every few seconds
+"""
+
+import json
+import os
+import threading
+import time
+
+
+STATE_VERSION = 1
+
+
+class StateJournal:
+    """Debounced, atomically written journal of the player state"""
+
+    def __init__(self, path, zone_manager, interval=300, debounce=0.5):
+        """
+        Args:
+            path: JSON file the state is written to
+            zone_manager: DualZoneManager whose state is journaled
+            interval: Seconds between position refreshes while zones play
+            debounce: Seconds to collect a burst of changes into one write
+        """
+        self.path = path
+        self.zone_manager = zone_manager
+        self.interval = interval
+        self.debounce = debounce
+
+        self.preset = None
+        self.writes = 0
+        self.skipped = 0
+        self.last_write = None
+        self.journaled = None  # State as last written (or loaded)
+        self.ready = False
+        self.dirty = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def load(self):
+        """
+        Read the journaled state
+
+        Returns:
+            State dict, or None if there is no usable journal
+        """
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable state journal: {e}")
+            return None
+
+        if state.get('version') != STATE_VERSION:
+            return None
+        self.preset = state.get('preset')
+        self.journaled = state
+        return state
+
+    def mark_dirty(self, *_):
+        """
+        Schedule a check for changes (accepts and ignores callback arguments)
+
+        Every zone operation marks the journal dirty; it is only rewritten if
+        the state actually differs from what is journaled.
+        """
+        self.dirty.set()
+
+    def set_preset(self, name):
+        self.preset = name
+        self.mark_dirty()
+
+    def start(self, ready=None):
+        """
+        Start the writer thread
+
+        Args:
+            ready: Optional callable that blocks until the boot restore is
+                   done, so a half-restored state is never written back
+        """
+        self.thread = threading.Thread(target=self._run, args=(ready,), name='state-journal', daemon=True)
+        self.thread.start()
+
+    def write(self, positions=False):
+        """
+        Snapshot the current state and replace the journal atomically if it changed
+
+        Args:
+            positions: Also write when only playback positions moved
+
+        Returns:
+            True if the journal was written
+        """
+        with self.lock:
+            state = self.zone_manager.get_state()
+            state['version'] = STATE_VERSION
+            state['preset'] = self.preset
+            if self.journaled and _settings(state) == _settings(self.journaled):
+                if not positions or _positions(state) == _positions(self.journaled):
+                    self.skipped += 1
+                    return False
+            self._replace(state)
+            return True
+
+    def flush(self):
+        """
+        Save the current playback positions at shutdown
+
+        Only positions are updated: MPV may already be exiting, and a zone
+        stopped by the shutdown must still come back at boot.
+        """
+        if not self.ready or not self.journaled:
+            return
+        with self.lock:
+            state = json.loads(json.dumps(self.journaled))
+            for name, current in self.zone_manager.get_state()['zones'].items():
+                zone = state.get('zones', {}).get(name)
+                if zone and current['position'] is not None and current['source'] == zone.get('source'):
+                    zone['position'] = current['position']
+            try:
+                self._replace(state)
+            except Exception as e:
+                print(f"⚠️ Could not write state journal: {e}")
+
+    def _replace(self, state):
+        state['saved'] = time.time()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        # Write, fsync and rename so a power cut leaves either the old or the new journal
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+        self.journaled = state
+        self.writes += 1
+        self.last_write = state['saved']
+
+    def get_status(self):
+        return {
+            'path': self.path,
+            'preset': self.preset,
+            'writes': self.writes,
+            'skipped': self.skipped,
+            'last_write': self.last_write
+        }
+
+    def _playing(self):
+        return self.zone_manager.zone1.is_running() or self.zone_manager.zone2.is_running()
+
+    def _run(self, ready):
+        if ready:
+            ready()
+        self.ready = True
+        refresh_at = time.monotonic() + self.interval
+        while True:
+            changed = self.dirty.wait(max(0, refresh_at - time.monotonic()))
+            refresh = time.monotonic() >= refresh_at
+            if refresh:
+                refresh_at = time.monotonic() + self.interval
+            if not changed and not self._playing():
+                continue
+            if changed:
+                # Let the rest of a burst (e.g. a preset load) land first
+                time.sleep(self.debounce)
+                self.dirty.clear()
+            try:
+                self.write(positions=refresh)
+            except Exception as e:
+                print(f"⚠️ Could not write state journal: {e}")
+
+
+def _positions(state):
+    """Playback position of each zone"""
+    return {name: zone.get('position') for name, zone in state.get('zones', {}).items()}
+
+
+def _settings(state):
+    """Everything journaled except positions and the write time, which always change"""
+    zones = {name: {key: value for key, value in zone.items() if key != 'position'}
+             for name, zone in state.get('zones', {}).items()}
+    # Compare as JSON would store it (tuples become lists, keys strings)
+    return json.loads(json.dumps(dict(
+        {key: value for key, value in state.items() if key != 'saved'}, zones=zones)))
+
+
+def restore_zone(zone_manager, zone_id, state, started_at):
+    """
+    Bring one zone back to its journaled state
+
+    Args:
+        zone_manager: DualZoneManager to restore into
+        zone_id: Zone to restore
+        state: Full journaled state (as returned by StateJournal.load)
+        started_at: time.monotonic() at process start, for time-to-first-frame
+
+    Returns:
+        Dict describing the restore, including time_to_first_frame_ms
+    """
+    zone = zone_manager.zone1 if zone_id == 1 else zone_manager.zone2
+    saved = state.get('zones', {}).get(f'zone{zone_id}') or {}
+    report = {'restored': False, 'source': saved.get('source')}
+
+    # Settings are restored even for a stopped zone so the next play uses them
+    if saved.get('geometry'):
+        zone.geometry.update(saved['geometry'])
+    if saved.get('volume') is not None:
+        zone.volume = saved['volume']
+    if saved.get('loop') is not None:
+        zone.loop = saved['loop']
+    if saved.get('audio'):
+        zone.audio.update(saved['audio'])
+    if saved.get('output'):
+        try:
+            zone.output = zone_manager.resolve_output(zone_id, saved['output'])
+        except ValueError as e:
+            print(f"[Zone {zone_id}] Not restoring output binding: {e}")
+
+    if not saved.get('running') or not saved.get('source'):
+        return report
+
+    playlist = saved.get('playlist')
+    if playlist:
+        playlist = [entry for entry in playlist if os.path.exists(entry['path'])]
+        if not playlist:
+            report['error'] = 'Slideshow frames no longer cached'
+            return report
+        success = zone_manager.start_zone_playlist(zone_id, playlist)
+    else:
+        source = saved['source']
+        is_stream = '://' in source
+        if not is_stream and not os.path.exists(source):
+            report['error'] = 'Source no longer exists'
+            return report
+        # Streams are live: resuming at the old position makes no sense
+        position = None if is_stream else saved.get('position')
+        report['position'] = position
+        success = zone_manager.start_zone(zone_id, source, start_position=position, warm=not is_stream)
+
+    if not success:
+        report['error'] = 'MPV failed to start'
+        return report
+
+    report['restored'] = True
+    if zone.is_running() and zone.wait_for_first_frame():
+        report['time_to_first_frame_ms'] = round((time.monotonic() - started_at) * 1000)
+        print(f"[Zone {zone_id}] Restored, first frame {report['time_to_first_frame_ms']} ms after start")
+    if saved.get('paused') and zone.is_running():
+        zone_manager.pause_zone(zone_id)
+    return report
@@ -4,30 +4,139 @@ Video Controller - Flask HTTP API for dual-zone video player
 Provides REST API for controlling two independent MPV instances
 """
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
-from werkzeug.utils import secure_filename
 import os
+import sys
+import time
+import atexit
+import signal
+import threading
+
+# Taken before anything heavy is imported: time-to-first-frame is measured from here
+PROCESS_START = time.monotonic()
+
+from mpv_manager import DualZoneManager
+from command_queue import CommandDispatcher, DONE, FAILED
+from state_journal import StateJournal, restore_zone
+from media_index import MediaIndex, SEEK_MODES
+
+# Boot-to-picture: the zones are created and the journaled state is restored
+# before Flask and the rest of the app are imported, so MPV brings the picture
+# up while the web server is still loading
+DATA_DIR = os.environ.get('DATA_DIR', '/opt/rpi-video-player/data')
+MPV_SOCKET = os.environ.get('MPV_SOCKET', '/tmp/mpvsocket')
+CACHE_BUDGET_MB = int(os.environ.get('CACHE_BUDGET_MB', 256))  # Page-cache budget shared by both zones
+WARM_SECONDS = int(os.environ.get('WARM_SECONDS', 30))  # Seconds of each local file pre-loaded from its start position
+UPLOAD_FOLDER = os.path.join(DATA_DIR, 'videos')
+MEDIA_INDEX_DIR = os.path.join(DATA_DIR, 'index')  # Keyframe index and cue points per uploaded video
+STATE_FILE = os.path.join(DATA_DIR, 'state.json')
+RESTORE_STATE = os.environ.get('RESTORE_STATE', '1') == '1'
+STATE_JOURNAL_INTERVAL = 300  # Seconds between playback position refreshes (changes are written right away)
+
+# Durations from the index turn WARM_SECONDS into bytes, restored positions into offsets
+media_index = MediaIndex(UPLOAD_FOLDER, MEDIA_INDEX_DIR)
+zone_manager = DualZoneManager(cache_budget_mb=CACHE_BUDGET_MB, socket_path=MPV_SOCKET,
+                               warm_seconds=WARM_SECONDS, duration_of=media_index.duration)
+dispatcher = CommandDispatcher(zone_ids=(1, 2))
+state_journal = StateJournal(STATE_FILE, zone_manager, interval=STATE_JOURNAL_INTERVAL)
+
+# Restores run first on each zone's worker, so API commands queue up behind them
+restore_operations = []
+saved_state = state_journal.load() if RESTORE_STATE else None
+if saved_state:
+    if saved_state.get('display_resolution'):
+        zone_manager.display_resolution = saved_state['display_resolution']
+    restore_operations = [
+        dispatcher.submit(zone_id, 'restore', restore_zone, zone_manager, zone_id, saved_state, PROCESS_START)
+        for zone_id in (1, 2)
+    ]
+
+dispatcher.add_listener(state_journal.mark_dirty)
+state_journal.start(ready=lambda: [dispatcher.wait(op.id) for op in restore_operations])
+# Positions are refreshed rarely to spare the SD card: save them when the service stops
+atexit.register(state_journal.flush)
+
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory
+from werkzeug.utils import secure_filename
 import json
+import math
+from functools import wraps
 from pathlib import Path
 
-from mpv_manager import DualZoneManager
 from preset_manager import PresetManager
+from cache_warmer import WARM_MODES
+from geometry_stream import GeometryStreamer
+from layout import validate_geometry, snap_to_grid, analyze_layout
+from fleet import FleetCoordinator, FleetAnnouncer
+from slideshow import FrameCache, Slideshow, IMAGE_EXTENSIONS, is_image
+from zone_log import LEVELS as LOG_LEVELS
+from governor import QualityGovernor
+from snapshot import SnapshotService
+
+IMPORTS_DONE = time.monotonic()
 
 app = Flask(__name__, 
             template_folder='../web/templates',
             static_folder='../web/static')
 
 # Configuration
-UPLOAD_FOLDER = '/opt/rpi-video-player/data/videos'
-ALLOWED_EXTENSIONS = {'mp4', 'mkv', 'avi', 'mov', 'flv', 'wmv', 'webm', 'm4v', 'mpg', 'mpeg'}
+PORT = int(os.environ.get('PORT', 5000))
+PRESETS_FILE = os.path.join(DATA_DIR, 'presets.json')
+VIDEO_EXTENSIONS = {'mp4', 'mkv', 'avi', 'mov', 'flv', 'wmv', 'webm', 'm4v', 'mpg', 'mpeg'}
+ALLOWED_EXTENSIONS = VIDEO_EXTENSIONS | IMAGE_EXTENSIONS
+FRAME_CACHE_DIR = os.path.join(DATA_DIR, 'cache', 'frames')
+# Snapshots are rewritten every few seconds while polled: keep them off the SD card,
+# one directory per instance (port) so players sharing a host don't overwrite each other
+SNAPSHOT_DIR = (f'/dev/shm/rpi-video-player-{PORT}' if os.path.isdir('/dev/shm')
+                else os.path.join(DATA_DIR, 'cache', 'snapshots'))
+SNAPSHOT_TTL = float(os.environ.get('SNAPSHOT_TTL', 2))  # Seconds a snapshot is served from cache
+SNAPSHOT_WIDTH = 480
+PREVIEW_STALL_TIMEOUT = 30  # Seconds without a new frame before a preview stream is ended
+FRAME_CACHE_MB = int(os.environ.get('FRAME_CACHE_MB', 512))  # Decoded slideshow frames kept on disk
 MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
+WARM_LOCAL_FILES = True  # Default for the per-request "warm" option
+MAX_WAIT_SECONDS = 30  # Upper bound for ?wait= on queued zone operations
+LIVE_GEOMETRY_FPS = int(os.environ.get('LIVE_GEOMETRY_FPS', 60))  # Match the display refresh rate
+LIVE_GEOMETRY_COMMIT_DELAY = 0.5  # Seconds of drag inactivity before a live geometry is committed
+
+# Fleet control: every player announces itself, a coordinator fans commands out
+FLEET_ANNOUNCE = os.environ.get('FLEET_ANNOUNCE', '1') == '1'
+FLEET_COORDINATOR = os.environ.get('FLEET_COORDINATOR', '0') == '1'
+FLEET_PEERS = [peer for peer in os.environ.get('FLEET_PEERS', '').split(',') if peer.strip()]
+FLEET_TIMEOUT = float(os.environ.get('FLEET_TIMEOUT', 3))
+
+# Quality governor: steps quality down under thermal/decode pressure
+GOVERNOR_ENABLED = os.environ.get('GOVERNOR_ENABLED', '1') == '1'
+GOVERNOR_INTERVAL = 5  # Seconds between temperature/drop samples
+GOVERNOR_PRIMARY_ZONE = int(os.environ.get('GOVERNOR_PRIMARY_ZONE', 1))  # Degraded last
+
+AUDIO_MODES = ('on', 'mute', 'duck')
+
+# Serializes layout submissions: visibility is computed from what is already queued
+layout_lock = threading.Lock()
+
+# A stop makes these still-queued operations pointless (geometry is kept, it applies to the next play)
+STOP_SUPERSEDES = ('play', 'pause', 'seek', 'volume')
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE
 
-# Initialize managers
-zone_manager = DualZoneManager()
-preset_manager = PresetManager()
+# Initialize managers (zone_manager, dispatcher and media_index are created above)
+preset_manager = PresetManager(presets_file=PRESETS_FILE)
+# The live preview's final geometry is queued like any other layout change
+geometry_streamer = GeometryStreamer(zone_manager, dispatcher,
+                                     lambda zone_id, geometry: submit_layout({zone_id: geometry}),
+                                     fps=LIVE_GEOMETRY_FPS,
+                                     commit_delay=LIVE_GEOMETRY_COMMIT_DELAY)
+
+frame_cache = FrameCache(FRAME_CACHE_DIR, max_bytes=FRAME_CACHE_MB * 1024 * 1024,
+                         protect=zone_manager.playlist_paths)
+slideshow = Slideshow(zone_manager, frame_cache, dispatcher)
+snapshots = SnapshotService(zone_manager, SNAPSHOT_DIR, ttl=SNAPSHOT_TTL, width=SNAPSHOT_WIDTH)
+quality_governor = QualityGovernor(zone_manager, dispatcher,
+                                   interval=GOVERNOR_INTERVAL,
+                                   primary_zone=GOVERNOR_PRIMARY_ZONE,
+                                   enabled=GOVERNOR_ENABLED)
+fleet = FleetCoordinator(port=PORT, peers=FLEET_PEERS, timeout=FLEET_TIMEOUT) if FLEET_COORDINATOR else None
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -39,6 +148,38 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def operation_succeeded(operation):
+    """A finished operation succeeded unless it failed or returned False"""
+    return operation.status != FAILED and operation.result is not False
+
+
+def dispatch_response(operations, **fields):
+    """
+    Build the response for queued zone operations
+    
+    Returns 202 with the operation IDs straight away. With ?wait=<seconds> the
+    request blocks until the operations finish (or the timeout passes), which
+    keeps simple scripts working synchronously.
+    """
+    wait = request.args.get('wait', type=float)
+    if wait:
+        timeout = min(wait, MAX_WAIT_SECONDS)
+        operations = [dispatcher.wait(op.id, timeout) for op in operations]
+    
+    finished = all(op.is_finished() for op in operations)
+    response = {
+        'success': all(operation_succeeded(op) for op in operations if op.is_finished()),
+        'operations': [op.to_dict() for op in operations]
+    }
+    if len(operations) == 1:
+        response['operation_id'] = operations[0].id
+    else:
+        response['operation_ids'] = [op.id for op in operations]
+    response.update(fields)
+    
+    return jsonify(response), 200 if finished else 202
+
+
 @app.route('/')
 def dashboard():
     """Main dashboard interface"""
@@ -59,7 +200,8 @@ def play_zone(zone_id):
         "source": "/path/to/video.mp4" or "rtsp://...",
         "geometry": {"x": 0, "y": 0, "width": 960, "height": 1080},
         "volume": 50,
-        "loop": true
+        "loop": true,
+        "warm": true  (optional: true, "fadvise" or "mmap")
     }
     """
     if zone_id not in [1, 2]:
@@ -79,21 +221,85 @@ def play_zone(zone_id):
         if not os.path.exists(source):
             return jsonify({'error': f'File not found: {source}'}), 404
     
+    # Same checks as a geometry update, against the zone's current geometry
     geometry = data.get('geometry')
+    if geometry is not None:
+        if not isinstance(geometry, dict):
+            return jsonify({'error': 'geometry must be an object'}), 400
+        merged = zone_manager.get_zone_status(zone_id)['geometry']
+        merged.update(geometry)
+        try:
+            validated = validate_geometry(merged, zone_manager.get_zone_display(zone_id))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        geometry = {key: validated[key] for key in geometry if key in validated}
+    
     volume = data.get('volume')
     loop = data.get('loop')
+    warm = data.get('warm', WARM_LOCAL_FILES)
+    if isinstance(warm, str) and warm not in WARM_MODES:
+        return jsonify({'error': f'Invalid warm mode. Must be one of: {", ".join(WARM_MODES)}'}), 400
     
-    success = zone_manager.start_zone(zone_id, source, geometry, volume, loop)
+    # Still images are shown until replaced and need no page-cache warm-up
+    if is_image(source):
+        warm = False
     
-    if success:
-        return jsonify({
-            'success': True,
-            'zone_id': zone_id,
-            'source': source,
-            'status': zone_manager.get_zone_status(zone_id)
-        })
-    else:
-        return jsonify({'error': 'Failed to start playback'}), 500
+    slideshow.stop(zone_id)
+    operation = dispatcher.submit(zone_id, 'play', zone_manager.start_zone,
+                                  zone_id, source, geometry, volume, loop, warm,
+                                  coalesce=('play',))
+    
+    return dispatch_response([operation], zone_id=zone_id, source=source)
+
+
+@app.route('/api/zone/<int:zone_id>/slideshow', methods=['POST'])
+def play_slideshow(zone_id):
+    """
+    Start an image slideshow in specified zone
+    
+    POST /api/zone/1/slideshow
+    {
+        "images": ["menu-1.jpg", "menu-2.png", "/path/to/promo.webp"],
+        "duration": 8,       (seconds per image)
+        "crossfade": 1.0,    (optional, seconds; needs Pillow)
+        "geometry": {"x": 0, "y": 0, "width": 960, "height": 1080},
+        "loop": true
+    }
+    """
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id. Must be 1 or 2'}), 400
+    
+    data = request.get_json()
+    if not data or not data.get('images'):
+        return jsonify({'error': 'Missing images parameter'}), 400
+    
+    images = []
+    for image in data['images']:
+        if not os.path.isabs(image):
+            image = os.path.join(UPLOAD_FOLDER, image)
+        if not is_image(image):
+            return jsonify({'error': f'Not a supported image: {image}'}), 400
+        if not os.path.exists(image):
+            return jsonify({'error': f'File not found: {image}'}), 404
+        images.append(image)
+    
+    try:
+        duration = float(data.get('duration', 10))
+        crossfade = float(data.get('crossfade', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'duration and crossfade must be numbers'}), 400
+    if duration <= 0 or crossfade < 0:
+        return jsonify({'error': 'duration must be positive and crossfade not negative'}), 400
+    
+    geometry = data.get('geometry')
+    loop = data.get('loop', True)
+    
+    operation = dispatcher.submit(zone_id, 'play', slideshow.start,
+                                  zone_id, images, duration, crossfade, geometry, loop,
+                                  coalesce=('play',))
+    
+    return dispatch_response([operation], zone_id=zone_id, images=images,
+                             crossfade_enabled=frame_cache.available() and crossfade > 0)
 
 
 @app.route('/api/zone/<int:zone_id>/stop', methods=['POST'])
@@ -102,15 +308,23 @@ def stop_zone(zone_id):
     if zone_id not in [1, 2]:
         return jsonify({'error': 'Invalid zone_id'}), 400
     
-    zone_manager.stop_zone(zone_id)
-    return jsonify({'success': True, 'zone_id': zone_id})
+    slideshow.stop(zone_id)
+    operation = dispatcher.submit(zone_id, 'stop', zone_manager.stop_zone, zone_id,
+                                  coalesce=STOP_SUPERSEDES)
+    return dispatch_response([operation], zone_id=zone_id)
 
 
 @app.route('/api/stop-all', methods=['POST'])
 def stop_all():
     """Stop all zones (black screen)"""
-    zone_manager.stop_all()
-    return jsonify({'success': True, 'message': 'All zones stopped'})
+    slideshow.stop(1)
+    slideshow.stop(2)
+    operations = [
+        dispatcher.submit(zone_id, 'stop', zone_manager.stop_zone, zone_id,
+                          coalesce=STOP_SUPERSEDES)
+        for zone_id in (1, 2)
+    ]
+    return dispatch_response(operations, message='All zones stopping')
 
 
 @app.route('/api/zone/<int:zone_id>/pause', methods=['POST'])
@@ -119,12 +333,8 @@ def pause_zone(zone_id):
     if zone_id not in [1, 2]:
         return jsonify({'error': 'Invalid zone_id'}), 400
     
-    is_paused = zone_manager.pause_zone(zone_id)
-    return jsonify({
-        'success': True,
-        'zone_id': zone_id,
-        'paused': is_paused
-    })
+    operation = dispatcher.submit(zone_id, 'pause', zone_manager.pause_zone, zone_id)
+    return dispatch_response([operation], zone_id=zone_id)
 
 
 @app.route('/api/zone/<int:zone_id>/seek', methods=['POST'])
@@ -133,23 +343,47 @@ def seek_zone(zone_id):
     Seek in specified zone
     
     POST /api/zone/1/seek
-    {"seconds": 10}  or  {"seconds": -10}
+    {"seconds": 10}  or  {"seconds": -10}                 (relative)
+    {"position": 125.4, "mode": "exact"}                  (absolute: auto, absolute, exact, keyframe)
+    {"cue": "intro"}                                      (named cue point of the playing file)
     """
     if zone_id not in [1, 2]:
         return jsonify({'error': 'Invalid zone_id'}), 400
     
     data = request.get_json()
-    if not data or 'seconds' not in data:
-        return jsonify({'error': 'Missing seconds parameter'}), 400
+    if not data or not any(key in data for key in ('seconds', 'position', 'cue')):
+        return jsonify({'error': 'Missing seconds, position or cue parameter'}), 400
     
-    seconds = data['seconds']
-    success = zone_manager.seek_zone(zone_id, seconds)
+    if 'seconds' in data:
+        seconds = data['seconds']
+        operation = dispatcher.submit(zone_id, 'seek', zone_manager.seek_zone, zone_id, seconds)
+        return dispatch_response([operation], zone_id=zone_id, seeked=seconds)
     
-    return jsonify({
-        'success': success,
-        'zone_id': zone_id,
-        'seeked': seconds
-    })
+    mode = data.get('mode', 'auto')
+    if mode not in SEEK_MODES:
+        return jsonify({'error': f"Invalid mode. Must be one of: {', '.join(SEEK_MODES)}"}), 400
+    
+    status = zone_manager.get_zone_status(zone_id)
+    # While the governor plays a lower rendition, cues belong to the original file
+    # (same timeline); the seek itself is planned on the keyframes of what is playing
+    original = media_index.name_for(status['quality'].get('rendition_of') or status['source'])
+    name = media_index.name_for(status['source'])
+    
+    if 'cue' in data:
+        entry = media_index.get(original) if original else None
+        if not entry or data['cue'] not in entry['cues']:
+            return jsonify({'error': f"Cue '{data['cue']}' not found for the playing file"}), 404
+        position = entry['cues'][data['cue']]
+    else:
+        try:
+            position = float(data['position'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Position must be a number of seconds'}), 400
+    
+    plan = media_index.plan_seek(name, position, mode)
+    operation = dispatcher.submit(zone_id, 'seek', zone_manager.seek_zone_to, zone_id, position, plan['flags'])
+    
+    return dispatch_response([operation], zone_id=zone_id, seek=plan)
 
 
 @app.route('/api/zone/<int:zone_id>/volume', methods=['POST'])
@@ -168,13 +402,50 @@ def set_zone_volume(zone_id):
         return jsonify({'error': 'Missing volume parameter'}), 400
     
     volume = int(data['volume'])
-    success = zone_manager.set_zone_volume(zone_id, volume)
+    operation = dispatcher.submit(zone_id, 'volume', zone_manager.set_zone_volume, zone_id, volume,
+                                  coalesce=('volume',))
     
-    return jsonify({
-        'success': success,
-        'zone_id': zone_id,
-        'volume': volume
-    })
+    return dispatch_response([operation], zone_id=zone_id, volume=volume)
+
+
+@app.route('/api/zone/<int:zone_id>/audio', methods=['POST'])
+def set_zone_audio(zone_id):
+    """
+    Set the audio policy for specified zone
+    
+    POST /api/zone/1/audio
+    {
+        "mode": "on" | "mute" | "duck",   (mute skips audio decoding entirely)
+        "device": "alsa/hdmi:CARD=vc4hdmi1,DEV=0",  (optional, null for default)
+        "duck_level": 20                  (optional, volume while ducked)
+    }
+    """
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id'}), 400
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Missing audio policy'}), 400
+    
+    policy = {key: data[key] for key in ('mode', 'device', 'duck_level') if key in data}
+    if 'mode' in policy and policy['mode'] not in AUDIO_MODES:
+        return jsonify({'error': f'Invalid mode. Must be one of: {", ".join(AUDIO_MODES)}'}), 400
+    if 'duck_level' in policy:
+        try:
+            policy['duck_level'] = int(policy['duck_level'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'duck_level must be a number'}), 400
+    if not policy:
+        return jsonify({'error': 'No valid audio parameters provided'}), 400
+    
+    operation = dispatcher.submit(zone_id, 'audio', zone_manager.set_zone_audio, zone_id, policy)
+    return dispatch_response([operation], zone_id=zone_id, audio=policy)
+
+
+@app.route('/api/audio/devices', methods=['GET'])
+def list_audio_devices():
+    """List audio output devices zones can be routed to"""
+    return jsonify({'devices': zone_manager.list_audio_devices()})
 
 
 @app.route('/api/zone/<int:zone_id>/geometry', methods=['POST'])
@@ -206,15 +477,138 @@ def update_zone_geometry(zone_id):
     if not geometry:
         return jsonify({'error': 'No valid geometry parameters provided'}), 400
     
-    success = zone_manager.update_zone_geometry(zone_id, geometry)
+    # Validate the resulting geometry against the zone's display
+    merged = zone_manager.get_zone_status(zone_id)['geometry']
+    merged.update(geometry)
+    try:
+        validate_geometry(merged, zone_manager.get_zone_display(zone_id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    operations = submit_layout({zone_id: geometry})
     
+    return dispatch_response(operations, zone_id=zone_id, geometry=geometry)
+
+
+@app.route('/api/zone/<int:zone_id>/geometry/live', methods=['POST'])
+def stream_zone_geometry(zone_id):
+    """
+    Live geometry preview while a zone is dragged on the layout canvas
+    
+    Updates are validated, coalesced to the display frame rate and applied in
+    place without restarting MPV. The geometry is committed (with the same
+    occlusion handling as a regular geometry update) once no update has
+    arrived for a short while, or immediately with "commit": true.
+    
+    POST /api/zone/1/geometry/live
+    {"x": 100, "y": 200, "width": 800, "height": 600, "commit": false}
+    """
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id'}), 400
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Missing geometry data'}), 400
+    
+    try:
+        geometry = {key: int(data[key]) for key in ('x', 'y', 'width', 'height') if key in data}
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Geometry values must be integers'}), 400
+    
+    # Every frame of the preview must be a geometry a regular update would accept
+    if geometry:
+        merged = zone_manager.get_zone_status(zone_id)['geometry']
+        merged.update(geometry)
+        try:
+            validate_geometry(merged, zone_manager.get_zone_display(zone_id))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    if data.get('commit'):
+        if geometry:
+            geometry_streamer.push(zone_id, geometry)
+        operations = geometry_streamer.commit(zone_id)
+        return dispatch_response(operations, zone_id=zone_id, geometry=geometry)
+    
+    if not geometry:
+        return jsonify({'error': 'No valid geometry parameters provided'}), 400
+    
+    stats = geometry_streamer.push(zone_id, geometry)
     return jsonify({
-        'success': success,
+        'success': True,
         'zone_id': zone_id,
-        'geometry': geometry
+        'geometry': geometry,
+        'stream': stats
     })
 
 
+def queued_geometry(zone_id):
+    """Geometry still waiting on a zone's worker (merged), or None"""
+    queued = [op.args[1] for op in dispatcher.queued(zone_id, 'geometry') if op.args[1]]
+    if not queued:
+        return None
+    merged = {}
+    for geometry in queued:
+        merged.update(geometry)
+    return merged
+
+
+def merge_layout(queued, operation):
+    """Fold a replaced layout update into its successor so partial geometries add up"""
+    zone_id, geometry, decode, reason = operation.args
+    if queued.args[1]:
+        # A geometry of None (only hide/uncover) never drops a queued move
+        geometry = dict(queued.args[1], **(geometry or {}))
+    operation.args = (zone_id, geometry, decode, reason)
+
+
+def submit_layout(geometries):
+    """
+    Queue geometry updates, merging any still-queued geometry updates into them
+    
+    Zones that end up zero-sized or fully hidden behind the other zone are
+    suspended instead of decoded. A zone that isn't being moved is only touched
+    if the change hides or uncovers it. Visibility is worked out from the
+    geometry each zone will have once its queue is through.
+    
+    Args:
+        geometries: Dict of zone_id -> geometry (may be partial)
+    
+    Returns:
+        List of queued Operations
+    """
+    with layout_lock:
+        pending = {zone_id: queued_geometry(zone_id) for zone_id in (1, 2)}
+        target = {}
+        for zone_id in (1, 2):
+            if pending[zone_id] or geometries.get(zone_id):
+                target[zone_id] = dict(pending[zone_id] or {}, **(geometries.get(zone_id) or {}))
+        analysis = zone_manager.analyze_layout(target)
+        operations = []
+        
+        for zone_id in (1, 2):
+            zone_layout = analysis[zone_id]
+            if zone_id in geometries:
+                geometry = geometries[zone_id]
+            else:
+                status = zone_manager.get_zone_status(zone_id)
+                hidden_now = status['suspended'] == 'occluded'
+                should_hide = zone_layout['skip_reason'] == 'occluded'
+                # A queued update carries a decode decision that may be stale now
+                if not pending[zone_id] and (hidden_now == should_hide or
+                                             not (status['running'] or status['suspended_source'])):
+                    continue
+                geometry = None
+            
+            operations.append(dispatcher.submit(
+                zone_id, 'geometry', zone_manager.apply_zone_layout,
+                zone_id, geometry, zone_layout['decode'], zone_layout['skip_reason'],
+                coalesce=('geometry',), merge=merge_layout
+            ))
+    
+    return operations
+
+
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get status of all zones"""
@@ -230,6 +624,156 @@ def get_zone_status(zone_id):
     return jsonify(zone_manager.get_zone_status(zone_id))
 
 
+# ========================================
+# OPERATION ENDPOINTS
+# ========================================
+
+@app.route('/api/zone/<int:zone_id>/logs', methods=['GET'])
+def get_zone_logs(zone_id):
+    """
+    Recent MPV messages for a zone, with warning counters
+    
+    GET /api/zone/1/logs?level=warning&category=network_error&module=ffmpeg&contains=rtsp&since=1760000000&limit=100
+    """
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id'}), 400
+    
+    level = request.args.get('level')
+    if level and level not in LOG_LEVELS:
+        return jsonify({'error': f"Invalid level. Must be one of: {', '.join(LOG_LEVELS)}"}), 400
+    
+    logs = zone_manager.get_zone_logs(
+        zone_id,
+        level=level,
+        category=request.args.get('category'),
+        module=request.args.get('module'),
+        contains=request.args.get('contains'),
+        since=request.args.get('since', type=float),
+        limit=request.args.get('limit', default=100, type=int)
+    )
+    logs['zone_id'] = zone_id
+    return jsonify(logs)
+
+
+@app.route('/api/zone/<int:zone_id>/logs', methods=['DELETE'])
+def clear_zone_logs(zone_id):
+    """Clear a zone's log buffer and counters"""
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id'}), 400
+    
+    zone = zone_manager.zone1 if zone_id == 1 else zone_manager.zone2
+    zone.log.clear()
+    return jsonify({'success': True, 'zone_id': zone_id})
+
+
+@app.route('/api/zone/<int:zone_id>/snapshot', methods=['GET'])
+def get_zone_snapshot(zone_id):
+    """
+    Low-resolution JPEG of what a zone is showing
+    
+    GET /api/zone/1/snapshot
+    
+    Snapshots are cached for SNAPSHOT_TTL seconds and shared between
+    concurrent requests, so polling dashboards don't cause extra captures.
+    """
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id'}), 400
+    
+    zone = zone_manager.zone1 if zone_id == 1 else zone_manager.zone2
+    if not zone.is_running():
+        return jsonify({'error': 'Zone is not playing'}), 409
+    
+    snapshot = snapshots.get(zone_id)
+    if snapshot is None:
+        return jsonify({'error': 'Snapshot capture failed'}), 500
+    
+    return Response(snapshot['image'], mimetype='image/jpeg', headers={
+        'Cache-Control': f'max-age={int(SNAPSHOT_TTL)}',
+        'X-Snapshot-Captured': f"{snapshot['captured']:.3f}"
+    })
+
+
+@app.route('/api/zone/<int:zone_id>/preview.mjpeg', methods=['GET'])
+def stream_zone_preview(zone_id):
+    """
+    Low-fps MJPEG preview stream of a zone
+    
+    GET /api/zone/1/preview.mjpeg?fps=0.5
+    
+    Frames come from the same snapshot cache, so extra viewers add no
+    captures; the frame rate is capped at one frame per snapshot TTL. The
+    stream ends when the zone stops or no frame arrives for a while, which
+    is also how a disconnected client's slot is freed (nothing is written
+    to notice the disconnect otherwise).
+    """
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id'}), 400
+    
+    zone = zone_manager.zone1 if zone_id == 1 else zone_manager.zone2
+    if not zone.is_running():
+        return jsonify({'error': f'Zone {zone_id} is not playing'}), 409
+    
+    max_fps = 1.0 / SNAPSHOT_TTL if SNAPSHOT_TTL > 0 else 1.0
+    fps = min(max(request.args.get('fps', default=max_fps, type=float), 0.1), max_fps)
+    if not snapshots.open_stream():
+        return jsonify({'error': 'Too many preview streams'}), 503
+    
+    def generate():
+        interval = 1.0 / fps
+        last_captured = None
+        last_frame = time.monotonic()
+        while zone.is_running() and time.monotonic() - last_frame < PREVIEW_STALL_TIMEOUT:
+            started = time.monotonic()
+            snapshot = snapshots.get(zone_id)
+            if snapshot and snapshot['captured'] != last_captured:
+                last_captured = snapshot['captured']
+                last_frame = started
+                yield (b'--frame\r\nContent-Type: image/jpeg\r\n'
+                       + f"Content-Length: {len(snapshot['image'])}\r\n\r\n".encode('ascii')
+                       + snapshot['image'] + b'\r\n')
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    
+    response = Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    # Frees the stream slot once the client disconnects
+    response.call_on_close(snapshots.close_stream)
+    return response
+
+
+@app.route('/api/operations', methods=['GET'])
+def list_operations():
+    """
+    List recent zone operations (most recent first)
+    
+    GET /api/operations?zone=1&limit=20
+    """
+    zone_id = request.args.get('zone', type=int)
+    limit = request.args.get('limit', default=50, type=int)
+    return jsonify({
+        'operations': dispatcher.tracker.list(zone_id, limit),
+        'queues': dispatcher.get_status(),
+        'frame_cache': frame_cache.get_status(),
+        'geometry_stream': geometry_streamer.get_status()
+    })
+
+
+@app.route('/api/operations/<operation_id>', methods=['GET'])
+def get_operation(operation_id):
+    """
+    Get the state of a queued zone operation
+    
+    GET /api/operations/op-12?wait=5  (long-poll until finished, up to 5 seconds)
+    """
+    wait = request.args.get('wait', type=float)
+    if wait:
+        operation = dispatcher.wait(operation_id, min(wait, MAX_WAIT_SECONDS))
+    else:
+        operation = dispatcher.get_operation(operation_id)
+    
+    if not operation:
+        return jsonify({'error': 'Operation not found'}), 404
+    return jsonify(operation.to_dict())
+
+
 # ========================================
 # PRESET ENDPOINTS
 # ========================================
@@ -273,8 +817,14 @@ def save_preset():
     description = data.get('description', '')
     zone1_geometry = data.get('zone1', {})
     zone2_geometry = data.get('zone2', {})
+    display_resolution = data.get('display_resolution') or zone_manager.display_resolution
+    grid = data.get('grid')
     
-    success = preset_manager.save_preset(name, zone1_geometry, zone2_geometry, description)
+    try:
+        success = preset_manager.save_preset(name, zone1_geometry, zone2_geometry, description,
+                                             display_resolution=display_resolution, grid=grid)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid preset: {e}'}), 400
     
     if success:
         return jsonify({
@@ -288,20 +838,95 @@ def save_preset():
 
 @app.route('/api/presets/<preset_name>/load', methods=['POST'])
 def load_preset(preset_name):
-    """Load and apply a preset configuration"""
-    preset = preset_manager.load_preset(preset_name)
+    """
+    Load and apply a preset configuration
+    
+    POST /api/presets/side-by-side/load
+    {"at": 1760000000.5}  (optional Unix timestamp to apply the preset at)
+    """
+    current = {f'zone{zone_id}': zone_manager.get_zone_status(zone_id)['geometry'] for zone_id in (1, 2)}
+    try:
+        preset = preset_manager.load_preset(preset_name, zone_manager.display_resolution, current)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid preset: {e}'}), 400
     
     if not preset:
         return jsonify({'error': 'Preset not found'}), 404
     
-    # Apply geometries to both zones
-    zone_manager.update_zone_geometry(1, preset['zone1'])
-    zone_manager.update_zone_geometry(2, preset['zone2'])
+    # Scheduled load, used by fleet coordinators to switch many walls together
+    data = request.get_json(silent=True) or {}
+    at = data.get('at')
+    if at is not None:
+        try:
+            at = float(at)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'at must be a Unix timestamp'}), 400
+        if not math.isfinite(at):
+            return jsonify({'error': 'at must be a Unix timestamp'}), 400
+    
+    if at is not None and at > time.time():
+        def apply_scheduled():
+            # Journaled when it fires, so a restart before then keeps the current preset
+            state_journal.set_preset(preset_name)
+            submit_layout({1: preset['zone1'], 2: preset['zone2']})
+        
+        timer = threading.Timer(at - time.time(), apply_scheduled)
+        timer.daemon = True
+        timer.start()
+        return jsonify({
+            'success': True,
+            'preset': preset_name,
+            'geometry': preset,
+            'scheduled_at': at
+        }), 202
+    
+    state_journal.set_preset(preset_name)
+    
+    # Apply geometries to both zones (each zone restarts on its own worker)
+    operations = submit_layout({1: preset['zone1'], 2: preset['zone2']})
+    
+    return dispatch_response(operations, preset=preset_name, geometry=preset)
+
+
+@app.route('/api/layout/analyze', methods=['POST'])
+def analyze_zone_layout():
+    """
+    Validate a layout and report overlap and which zones would be decoded
+    
+    POST /api/layout/analyze
+    {
+        "zone1": {"x": 0, "y": 0, "width": 1920, "height": 1080},
+        "zone2": {"x": 1440, "y": 810, "width": 480, "height": 270},
+        "display_resolution": {"width": 1920, "height": 1080},  (optional)
+        "grid": {"width": 192, "height": 108}                    (optional, LED cabinet size)
+    }
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Missing layout data'}), 400
+    
+    display = data.get('display_resolution') or zone_manager.display_resolution
+    grid = data.get('grid')
+    
+    zones = {}
+    errors = {}
+    for zone_name in ('zone1', 'zone2'):
+        geometry = data.get(zone_name, {'x': 0, 'y': 0, 'width': 0, 'height': 0})
+        try:
+            if grid:
+                geometry = snap_to_grid(geometry, grid, display)
+            zones[zone_name] = validate_geometry(geometry, display)
+        except ValueError as e:
+            errors[zone_name] = str(e)
+    
+    if errors:
+        return jsonify({'valid': False, 'errors': errors}), 400
     
     return jsonify({
-        'success': True,
-        'preset': preset_name,
-        'geometry': preset
+        'valid': True,
+        'display_resolution': display,
+        'zones': zones,
+        'layout': analyze_layout(zones, display)
     })
 
 
@@ -319,13 +944,129 @@ def delete_preset(preset_name):
         return jsonify({'error': 'Preset not found'}), 404
 
 
+# ========================================
+# FLEET ENDPOINTS (coordinator only)
+# ========================================
+
+def fleet_required(view):
+    """Reject fleet endpoints unless this instance is a coordinator"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if fleet is None:
+            return jsonify({'error': 'Fleet mode is disabled (set FLEET_COORDINATOR=1)'}), 404
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@app.route('/api/fleet/peers', methods=['GET'])
+@fleet_required
+def list_fleet_peers():
+    """List known peer players"""
+    return jsonify({'peers': fleet.list_peers()})
+
+
+@app.route('/api/fleet/peers', methods=['POST'])
+@fleet_required
+def add_fleet_peer():
+    """
+    Add a peer player manually
+    
+    POST /api/fleet/peers
+    {"host": "192.168.1.21", "port": 5000}
+    """
+    data = request.get_json()
+    if not data or 'host' not in data:
+        return jsonify({'error': 'Missing host'}), 400
+    
+    try:
+        port = int(data.get('port', 5000))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'port must be a number'}), 400
+    if not 0 < port < 65536:
+        return jsonify({'error': 'port must be 1-65535'}), 400
+    
+    peer_id = fleet.add_peer(data['host'], port)
+    return jsonify({'success': True, 'peer': peer_id})
+
+
+@app.route('/api/fleet/peers/<peer_id>', methods=['DELETE'])
+@fleet_required
+def remove_fleet_peer(peer_id):
+    """Remove a peer player"""
+    if fleet.remove_peer(peer_id):
+        return jsonify({'success': True, 'message': f'Peer {peer_id} removed'})
+    return jsonify({'error': 'Peer not found'}), 404
+
+
+@app.route('/api/fleet/status', methods=['GET'])
+@fleet_required
+def get_fleet_status():
+    """Aggregate status of every player (including this one)"""
+    return jsonify(fleet.aggregate_status(include_self=True))
+
+
+@app.route('/api/fleet/batch', methods=['POST'])
+@fleet_required
+def fleet_batch():
+    """
+    Run a batch of API commands on every player concurrently
+    
+    POST /api/fleet/batch
+    {
+        "commands": [
+            {"method": "POST", "path": "/api/zone/1/play", "body": {"source": "loop.mp4"}},
+            {"method": "POST", "path": "/api/zone/1/volume", "body": {"volume": 30}}
+        ],
+        "peers": ["192.168.1.21:5000"],  (optional, defaults to all)
+        "include_self": true              (optional)
+    }
+    """
+    data = request.get_json()
+    if not data or not data.get('commands'):
+        return jsonify({'error': 'Missing commands'}), 400
+    
+    commands = data['commands']
+    if any(not isinstance(command, dict) or not str(command.get('path', '')).startswith('/api/')
+           for command in commands):
+        return jsonify({'error': 'Each command needs a path starting with /api/'}), 400
+    
+    return jsonify(fleet.fan_out(commands, peer_ids=data.get('peers'),
+                                 include_self=bool(data.get('include_self', False))))
+
+
+@app.route('/api/fleet/presets/<preset_name>/load', methods=['POST'])
+@fleet_required
+def fleet_load_preset(preset_name):
+    """
+    Load a preset on every player at the same moment
+    
+    POST /api/fleet/presets/side-by-side/load
+    {"at": 1760000000.5}  or  {"lead_time": 2}  (seconds from now, default 2)
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        at = float(data['at']) if data.get('at') is not None else None
+        lead_time = float(data.get('lead_time', 2.0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'at must be a Unix timestamp and lead_time a number of seconds'}), 400
+    if (at is not None and not math.isfinite(at)) or not 0 <= lead_time <= 3600:
+        return jsonify({'error': 'at must be a Unix timestamp and lead_time 0-3600 seconds'}), 400
+    
+    result = fleet.load_preset(preset_name,
+                               at=at,
+                               lead_time=lead_time,
+                               include_self=bool(data.get('include_self', True)),
+                               peer_ids=data.get('peers'))
+    return jsonify(result)
+
+
 # ========================================
 # FILE MANAGEMENT ENDPOINTS
 # ========================================
 
 @app.route('/api/files', methods=['GET'])
 def list_files():
-    """List all uploaded video files"""
+    """List all uploaded video and image files"""
     try:
         files = []
         for filename in os.listdir(UPLOAD_FOLDER):
@@ -336,7 +1077,8 @@ def list_files():
                     'name': filename,
                     'path': filepath,
                     'size': stat.st_size,
-                    'modified': stat.st_mtime
+                    'modified': stat.st_mtime,
+                    'indexed': media_index.get(filename) is not None
                 })
         
         # Sort by name
@@ -350,7 +1092,7 @@ def list_files():
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
-    """Upload a video file"""
+    """Upload a video or image file"""
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
     
@@ -365,10 +1107,17 @@ def upload_file():
         
         try:
             file.save(filepath)
+            
+            # Index keyframes now so seeks in this file can be planned later
+            indexing = not is_image(filename)
+            if indexing:
+                media_index.build_async(filepath)
+            
             return jsonify({
                 'success': True,
                 'filename': filename,
-                'path': filepath
+                'path': filepath,
+                'indexing': indexing
             })
         except Exception as e:
             return jsonify({'error': f'Upload failed: {str(e)}'}), 500
@@ -385,6 +1134,7 @@ def delete_file(filename):
     try:
         if os.path.exists(filepath):
             os.remove(filepath)
+            media_index.remove(filename)
             return jsonify({
                 'success': True,
                 'message': f'File {filename} deleted'
@@ -395,6 +1145,97 @@ def delete_file(filename):
         return jsonify({'error': str(e)}), 500
 
 
+# ========================================
+# MEDIA INDEX AND CUE POINTS
+# ========================================
+
+@app.route('/api/media/<filename>', methods=['GET'])
+def get_media_index(filename):
+    """
+    Keyframe index summary and cue points of an uploaded video
+    
+    GET /api/media/intro.mp4?keyframes=1  (include the full keyframe list)
+    """
+    filename = secure_filename(filename)
+    summary = media_index.summary(filename, keyframes=request.args.get('keyframes') == '1')
+    if summary is None:
+        if media_index.is_building(filename):
+            return jsonify({'name': filename, 'building': True}), 202
+        return jsonify({'error': 'File is not indexed'}), 404
+    summary['building'] = media_index.is_building(filename)
+    return jsonify(summary)
+
+
+@app.route('/api/media/<filename>/index', methods=['POST'])
+def rebuild_media_index(filename):
+    """Re-probe an uploaded video's keyframes (cue points are kept)"""
+    filename = secure_filename(filename)
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    if not os.path.isfile(filepath) or is_image(filename):
+        return jsonify({'error': 'Video not found'}), 404
+    
+    media_index.build_async(filepath)
+    return jsonify({'success': True, 'name': filename, 'building': True}), 202
+
+
+@app.route('/api/media/<filename>/seek-cost', methods=['GET'])
+def get_seek_cost(filename):
+    """
+    How a seek to a position would be performed and how much it decodes
+    
+    GET /api/media/intro.mp4/seek-cost?position=125.4&mode=auto
+    """
+    filename = secure_filename(filename)
+    position = request.args.get('position', type=float)
+    mode = request.args.get('mode', 'auto')
+    if position is None:
+        return jsonify({'error': 'Missing position parameter'}), 400
+    if mode not in SEEK_MODES:
+        return jsonify({'error': f"Invalid mode. Must be one of: {', '.join(SEEK_MODES)}"}), 400
+    if media_index.get(filename) is None:
+        return jsonify({'error': 'File is not indexed'}), 404
+    
+    return jsonify(media_index.plan_seek(filename, position, mode))
+
+
+@app.route('/api/media/<filename>/cues', methods=['POST'])
+def set_cue_point(filename):
+    """
+    Add or move a named cue point
+    
+    POST /api/media/intro.mp4/cues
+    {"name": "chorus", "position": 62.5, "snap": true}
+    
+    With "snap" the cue moves to the nearest keyframe, so seeking to it
+    needs no decoding at all.
+    """
+    filename = secure_filename(filename)
+    data = request.get_json()
+    if not data or 'name' not in data or 'position' not in data:
+        return jsonify({'error': 'Missing name or position'}), 400
+    
+    try:
+        position = media_index.set_cue(filename, data['name'], data['position'], snap=bool(data.get('snap')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'name': data['name'],
+        'position': position,
+        'seek': media_index.plan_seek(filename, position)
+    })
+
+
+@app.route('/api/media/<filename>/cues/<cue>', methods=['DELETE'])
+def delete_cue_point(filename, cue):
+    """Delete a named cue point"""
+    filename = secure_filename(filename)
+    if not media_index.delete_cue(filename, cue):
+        return jsonify({'error': 'Cue not found'}), 404
+    return jsonify({'success': True, 'message': f'Cue {cue} deleted'})
+
+
 # ========================================
 # DISPLAY CONFIGURATION
 # ========================================
@@ -422,12 +1263,92 @@ def set_display_resolution():
     })
 
 
+@app.route('/api/outputs', methods=['GET'])
+def list_outputs():
+    """List DRM connectors (HDMI ports) with status, modes and bound zones"""
+    return jsonify({'outputs': zone_manager.list_outputs()})
+
+
+@app.route('/api/zone/<int:zone_id>/output', methods=['POST'])
+def set_zone_output(zone_id):
+    """
+    Bind a zone to a specific HDMI connector and DRM planes
+    
+    POST /api/zone/1/output
+    {
+        "connector": "HDMI-A-2",
+        "mode": "1920x1080@60",       (optional, default "preferred")
+        "draw_plane": "primary",      (optional)
+        "video_plane": "overlay",     (optional, scan out video without GPU composition)
+        "zero_copy": true             (optional, DRM-prime hardware decoding)
+    }
+    
+    {"connector": null} returns the zone to the X11 desktop.
+    """
+    if zone_id not in [1, 2]:
+        return jsonify({'error': 'Invalid zone_id'}), 400
+    
+    data = request.get_json()
+    if data is None:
+        return jsonify({'error': 'Missing output data'}), 400
+    
+    output = data if data.get('connector') else None
+    
+    # Validate up front so a bad binding is rejected before anything is queued
+    try:
+        if output:
+            output = zone_manager.resolve_output(zone_id, output)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def apply_output():
+        return zone_manager.set_zone_output(zone_id, output)
+    
+    operation = dispatcher.submit(zone_id, 'output', apply_output)
+    return dispatch_response([operation], zone_id=zone_id, output=output)
+
+
 @app.route('/api/display/resolution', methods=['GET'])
 def get_display_resolution():
     """Get current display resolution"""
     return jsonify(zone_manager.display_resolution)
 
 
+# ========================================
+# QUALITY GOVERNOR
+# ========================================
+
+@app.route('/api/governor', methods=['GET'])
+def get_governor_status():
+    """
+    Governor level, last sample and recent decisions
+    
+    GET /api/governor?decisions=50
+    """
+    decisions = request.args.get('decisions', default=20, type=int)
+    return jsonify(quality_governor.get_status(decisions=decisions))
+
+
+@app.route('/api/governor', methods=['POST'])
+def configure_governor():
+    """
+    Enable/disable the governor or tune its thresholds
+    
+    POST /api/governor
+    {"enabled": true, "thresholds": {"temp_high": 78, "recover_samples": 12}}
+    """
+    data = request.get_json()
+    if data is None:
+        return jsonify({'error': 'Missing governor settings'}), 400
+    
+    try:
+        quality_governor.configure(enabled=data.get('enabled'), thresholds=data.get('thresholds'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(dict(quality_governor.get_status(decisions=0), success=True))
+
+
 # ========================================
 # SYSTEM ENDPOINTS
 # ========================================
@@ -440,16 +1361,35 @@ def health_check():
         'zones_active': {
             'zone1': zone_manager.zone1.is_running(),
             'zone2': zone_manager.zone2.is_running()
-        }
+        },
+        'queues': dispatcher.get_status(),
+        'boot': boot_status(),
+        'state_journal': state_journal.get_status(),
+        'snapshots': snapshots.get_status()
     })
 
 
+def boot_status():
+    """How the last start went: restored zones and time to first frame"""
+    zones = {}
+    for op in restore_operations:
+        zones[f'zone{op.zone_id}'] = op.result if op.status == DONE else {'status': op.status, 'error': op.error}
+    return {
+        'restore_enabled': RESTORE_STATE,
+        'restored_preset': saved_state.get('preset') if saved_state else None,
+        'imports_ms': round((IMPORTS_DONE - PROCESS_START) * 1000),
+        'zones': zones
+    }
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🎬 Raspberry Pi Dual-Zone Video Player")
     print("=" * 60)
     print(f"📂 Upload folder: {UPLOAD_FOLDER}")
-    print(f"🌐 Starting Flask server on port 5000...")
+    print(f"🌐 Starting Flask server on port {PORT}...")
+    if fleet:
+        print(f"🛰 Fleet coordinator with {len(FLEET_PEERS)} static peers")
     print("=" * 60)
     
     # Create default presets if none exist
@@ -457,4 +1397,23 @@ if __name__ == '__main__':
         print("Creating default presets...")
         preset_manager.create_default_presets()
     
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    # Index videos uploaded before keyframe indexing existed
+    for filename in sorted(os.listdir(UPLOAD_FOLDER)):
+        if allowed_file(filename) and not is_image(filename) and media_index.get(filename) is None:
+            media_index.build_async(os.path.join(UPLOAD_FOLDER, filename))
+    
+    quality_governor.start()
+    
+    if FLEET_ANNOUNCE:
+        FleetAnnouncer(port=PORT).start()
+    if fleet:
+        fleet.start_discovery()
+    
+    # systemd stops the service with SIGTERM: exit normally so the journal is flushed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    
+    # HTTP/1.1 so fleet coordinators can keep connections alive between commands
+    from werkzeug.serving import WSGIRequestHandler
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+    
+    app.run(host='0.0.0.0', port=PORT, debug=False)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Zone Log - Drain MPV's terminal output into a bounded per-zone ring buffer
+MPV writes its log messages to stdout (and only a few to stderr); both are
+merged into one pipe and a reader thread per process keeps it empty, so MPV
+never blocks on a full pipe mid-playback. Known warnings (hwdec fallback,
+network errors, A/V desync) are turned into counters
+"""
+
+import re
+import threading
+import time
+from collections import deque
+
+
+LEVELS = ('debug', 'info', 'warning', 'error')
+
+# (category, level, pattern) matched against "[module] message" lines
+PATTERNS = [
+    ('hwdec_fallback', 'warning', re.compile(
+        r'Using software decoding|Could not create device|hwdec.*(fail|not supported|unavailable)|'
+        r'[Ff]alling back to software', re.IGNORECASE)),
+    ('network_error', 'error', re.compile(
+        r'Connection (refused|reset|timed out)|timed out|Network is unreachable|No route to host|'
+        r'Failed to open (rtsp|http|tcp|udp)|Stream ends prematurely|Server returned \d{3}|'
+        r'RTP: (missed|PT) |max delay reached', re.IGNORECASE)),
+    ('av_desync', 'warning', re.compile(r'desynchroni[sz]ation', re.IGNORECASE)),
+    ('decode_error', 'error', re.compile(
+        r'(decode|decoding) error|error while decoding|Invalid data found|corrupt', re.IGNORECASE)),
+]
+
+HWDEC_ACTIVE = re.compile(r'Using hardware decoding \(([^)]+)\)')
+ERROR_HINT = re.compile(r'\b(error|failed|cannot|could not|unable)\b', re.IGNORECASE)
+LINE = re.compile(r'^\[([\w/.-]+)\]\s?(.*)$')
+
+# MPV message levels passed to --msg-level: warnings everywhere, plus the
+# decoder's info messages so the hwdec in use is known
+MSG_LEVEL = 'all=warn,vd=info'
+INFO_MODULES = {'vd'}
+
+
+class ZoneLog:
+    """Ring buffer of recent MPV messages plus counters for one zone"""
+
+    def __init__(self, zone_id, max_lines=1000):
+        self.zone_id = zone_id
+        self.entries = deque(maxlen=max_lines)
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.hwdec = None
+        self.total = 0
+
+    def attach(self, process):
+        """
+        Start draining a freshly started MPV process's output pipe
+
+        Returns:
+            The reader thread (finishes when MPV exits)
+        """
+        self.add('info', 'player', f"MPV started (PID: {process.pid})", pid=process.pid)
+        thread = threading.Thread(target=self._drain, args=(process,),
+                                  name=f"zone{self.zone_id}-log", daemon=True)
+        thread.start()
+        return thread
+
+    def add(self, level, module, message, pid=None):
+        """Append a message, counting it if it matches a known problem"""
+        category = None
+        for name, pattern_level, pattern in PATTERNS:
+            if pattern.search(message):
+                category = name
+                level = pattern_level
+                break
+
+        entry = {
+            'time': time.time(),
+            'level': level,
+            'module': module,
+            'category': category,
+            'message': message,
+            'pid': pid
+        }
+        with self.lock:
+            self.entries.append(entry)
+            self.total += 1
+            if category:
+                self.counters[category] = self.counters.get(category, 0) + 1
+            if level == 'error':
+                self.counters['errors'] = self.counters.get('errors', 0) + 1
+            match = HWDEC_ACTIVE.search(message)
+            if match:
+                self.hwdec = match.group(1)
+            elif category == 'hwdec_fallback':
+                self.hwdec = 'software'
+        return entry
+
+    def query(self, level=None, category=None, module=None, contains=None, since=None, limit=100):
+        """
+        Filter the buffered messages
+
+        Args:
+            level: Minimum level ('debug', 'info', 'warning', 'error')
+            category: Only messages counted under this category
+            module: MPV module prefix, e.g. 'vd' or 'ffmpeg'
+            contains: Case-insensitive substring of the message
+            since: Only messages newer than this Unix timestamp
+            limit: Most recent N matches
+
+        Returns:
+            Matching entries, oldest first
+        """
+        minimum = LEVELS.index(level) if level in LEVELS else 0
+        needle = contains.lower() if contains else None
+        with self.lock:
+            entries = list(self.entries)
+
+        matches = [
+            entry for entry in entries
+            if LEVELS.index(entry['level']) >= minimum
+            and (category is None or entry['category'] == category)
+            and (module is None or entry['module'] == module or entry['module'].startswith(f"{module}/"))
+            and (needle is None or needle in entry['message'].lower())
+            and (since is None or entry['time'] > since)
+        ]
+        return matches[-limit:] if limit else matches
+
+    def tail(self, pid, lines=20):
+        """Last messages logged by one MPV process (for start-up failures)"""
+        with self.lock:
+            return [entry['message'] for entry in self.entries if entry['pid'] == pid][-lines:]
+
+    def get_status(self):
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'hwdec': self.hwdec,
+                'buffered': len(self.entries),
+                'capacity': self.entries.maxlen,
+                'total': self.total
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.counters = {}
+            self.total = 0
+
+    def _drain(self, process):
+        pid = process.pid
+        try:
+            for raw in iter(process.stdout.readline, b''):
+                line = raw.decode('utf-8', errors='replace').rstrip()
+                if not line:
+                    continue
+                match = LINE.match(line)
+                module, message = (match.group(1), match.group(2)) if match else ('mpv', line)
+                if ERROR_HINT.search(message):
+                    level = 'error'
+                else:
+                    level = 'info' if module in INFO_MODULES else 'warning'
+                self.add(level, module, message, pid=pid)
+        except (OSError, ValueError):
+            # Pipe closed under us while MPV was being stopped
+            pass
+        finally:
+            code = process.poll()
+            self.add('info', 'player', f"MPV exited (PID: {pid}, code: {code})", pid=pid)
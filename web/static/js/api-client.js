@@ -4,6 +4,10 @@
 
 const API_BASE = '';
 
+// Seconds to wait for queued zone operations (an MPV start can take a while)
+const OPERATION_TIMEOUT = 30;
+const FINISHED_STATES = ['done', 'failed', 'coalesced'];
+
 class APIClient {
     
     // ========================================
@@ -16,31 +20,35 @@ class APIClient {
         if (volume !== null) data.volume = volume;
         if (loop !== null) data.loop = loop;
         
-        return await this._post(`/api/zone/${zoneId}/play`, data);
+        return await this._zoneAction(`/api/zone/${zoneId}/play`, data);
     }
     
     async stopZone(zoneId) {
-        return await this._post(`/api/zone/${zoneId}/stop`);
+        return await this._zoneAction(`/api/zone/${zoneId}/stop`);
     }
     
     async stopAll() {
-        return await this._post('/api/stop-all');
+        return await this._zoneAction('/api/stop-all');
     }
     
     async pauseZone(zoneId) {
-        return await this._post(`/api/zone/${zoneId}/pause`);
+        return await this._zoneAction(`/api/zone/${zoneId}/pause`);
     }
     
     async seekZone(zoneId, seconds) {
-        return await this._post(`/api/zone/${zoneId}/seek`, { seconds });
+        return await this._zoneAction(`/api/zone/${zoneId}/seek`, { seconds });
     }
     
     async setZoneVolume(zoneId, volume) {
-        return await this._post(`/api/zone/${zoneId}/volume`, { volume });
+        return await this._zoneAction(`/api/zone/${zoneId}/volume`, { volume });
     }
     
     async updateZoneGeometry(zoneId, geometry) {
-        return await this._post(`/api/zone/${zoneId}/geometry`, geometry);
+        return await this._zoneAction(`/api/zone/${zoneId}/geometry`, geometry);
+    }
+    
+    async streamZoneGeometry(zoneId, geometry, commit = false) {
+        return await this._post(`/api/zone/${zoneId}/geometry/live`, { ...geometry, commit });
     }
     
     async getStatus() {
@@ -51,6 +59,11 @@ class APIClient {
         return await this._get(`/api/zone/${zoneId}/status`);
     }
     
+    async getOperation(operationId, wait = 0) {
+        const query = wait ? `?wait=${wait}` : '';
+        return await this._get(`/api/operations/${operationId}${query}`);
+    }
+    
     // ========================================
     // Presets
     // ========================================
@@ -73,7 +86,7 @@ class APIClient {
     }
     
     async loadPreset(name) {
-        return await this._post(`/api/presets/${name}/load`);
+        return await this._zoneAction(`/api/presets/${name}/load`);
     }
     
     async deletePreset(name) {
@@ -141,6 +154,27 @@ class APIClient {
     // Helper Methods
     // ========================================
     
+    /**
+     * POST a zone command and wait for its queued operations to finish.
+     * Zone commands answer 202 straight away; a failed MPV start only shows
+     * up in the operation, so it is raised here like an HTTP error.
+     */
+    async _zoneAction(endpoint, data = {}, timeout = OPERATION_TIMEOUT) {
+        const result = await this._post(endpoint, data);
+        const deadline = Date.now() + timeout * 1000;
+        
+        for (let operation of result.operations || []) {
+            while (!FINISHED_STATES.includes(operation.status) && Date.now() < deadline) {
+                const wait = Math.min(10, Math.ceil((deadline - Date.now()) / 1000));
+                operation = await this.getOperation(operation.operation_id, wait);
+            }
+            if (operation.status === 'failed' || operation.result === false) {
+                throw new Error(operation.error || `${operation.action} failed`);
+            }
+        }
+        return result;
+    }
+    
     async _get(endpoint) {
         try {
             const response = await fetch(`${API_BASE}${endpoint}`);
@@ -255,17 +289,13 @@ function setupEventListeners() {
         document.getElementById('zone1-volume-value').textContent = e.target.value;
     });
     
-    document.getElementById('zone1-volume').addEventListener('change', async (e) => {
-        await api.setZoneVolume(1, parseInt(e.target.value));
-    });
+    document.getElementById('zone1-volume').addEventListener('change', (e) => setZoneVolume(1, e.target.value));
     
     document.getElementById('zone2-volume').addEventListener('input', (e) => {
         document.getElementById('zone2-volume-value').textContent = e.target.value;
     });
     
-    document.getElementById('zone2-volume').addEventListener('change', async (e) => {
-        await api.setZoneVolume(2, parseInt(e.target.value));
-    });
+    document.getElementById('zone2-volume').addEventListener('change', (e) => setZoneVolume(2, e.target.value));
     
     // Geometry buttons
     document.getElementById('zone1-apply-geometry-btn').addEventListener('click', () => applyGeometry(1));
@@ -338,21 +368,45 @@ async function playZone(zoneId) {
 }
 
 async function stopZone(zoneId) {
-    await api.stopZone(zoneId);
-    console.log(`⏹ Zone ${zoneId} stopped`);
+    try {
+        await api.stopZone(zoneId);
+        console.log(`⏹ Zone ${zoneId} stopped`);
+    } catch (error) {
+        alert(`Failed to stop zone ${zoneId}: ${error.message}`);
+    }
 }
 
 async function stopAll() {
-    await api.stopAll();
-    console.log('⏹ All zones stopped');
+    try {
+        await api.stopAll();
+        console.log('⏹ All zones stopped');
+    } catch (error) {
+        alert(`Failed to stop zones: ${error.message}`);
+    }
 }
 
 async function pauseZone(zoneId) {
-    await api.pauseZone(zoneId);
+    try {
+        await api.pauseZone(zoneId);
+    } catch (error) {
+        alert(`Failed to pause zone ${zoneId}: ${error.message}`);
+    }
 }
 
 async function seekZone(zoneId, seconds) {
-    await api.seekZone(zoneId, seconds);
+    try {
+        await api.seekZone(zoneId, seconds);
+    } catch (error) {
+        alert(`Failed to seek zone ${zoneId}: ${error.message}`);
+    }
+}
+
+async function setZoneVolume(zoneId, volume) {
+    try {
+        await api.setZoneVolume(zoneId, parseInt(volume));
+    } catch (error) {
+        alert(`Failed to set volume: ${error.message}`);
+    }
 }
 
 async function applyGeometry(zoneId) {
@@ -34,6 +34,14 @@ class CanvasController {
         // Resize handle size (larger for easier grabbing)
         this.handleSize = 20;
         
+        // Live preview: stream geometry to the wall while dragging
+        // (one request in flight per zone, latest geometry wins). Off by
+        // default: drags only fill the geometry form and Apply commits it
+        this.livePreview = false;
+        this.liveInFlight = {};
+        this.livePending = {};
+        this.liveDirty = {};
+        
         // Setup event listeners
         this.setupEventListeners();
         
@@ -49,6 +57,14 @@ class CanvasController {
         
         // Update cursor based on hover
         this.canvas.addEventListener('mousemove', (e) => this.updateCursor(e));
+        
+        const liveToggle = document.getElementById('live-preview-toggle');
+        if (liveToggle) {
+            this.livePreview = liveToggle.checked;
+            liveToggle.addEventListener('change', (e) => {
+                this.livePreview = e.target.checked;
+            });
+        }
     }
     
     setDisplayResolution(width, height) {
@@ -113,11 +129,13 @@ class CanvasController {
         if (this.dragging) {
             // Update input fields
             this.syncZoneToInputs(this.dragging);
+            this.commitLiveGeometry(this.dragging);
         }
         
         if (this.resizing) {
             // Update input fields
             this.syncZoneToInputs(this.resizing.zone);
+            this.commitLiveGeometry(this.resizing.zone);
         }
         
         this.dragging = null;
@@ -142,6 +160,7 @@ class CanvasController {
         zone.y = newY;
         
         this.render();
+        this.streamLiveGeometry(this.dragging);
     }
     
     handleResize(pos) {
@@ -196,6 +215,57 @@ class CanvasController {
         }
         
         this.render();
+        this.streamLiveGeometry(zoneName);
+    }
+    
+    getZoneGeometry(zoneName) {
+        const { x, y, width, height } = this.zones[zoneName];
+        return { x, y, width, height };
+    }
+    
+    streamLiveGeometry(zoneName) {
+        if (!this.livePreview) {
+            return;
+        }
+        
+        // Only the latest geometry matters; send it when the previous request returns
+        this.liveDirty[zoneName] = true;
+        this.livePending[zoneName] = true;
+        if (this.liveInFlight[zoneName]) {
+            return;
+        }
+        
+        const zoneId = zoneName === 'zone1' ? 1 : 2;
+        this.livePending[zoneName] = false;
+        this.liveInFlight[zoneName] = api.streamZoneGeometry(zoneId, this.getZoneGeometry(zoneName))
+            .catch((error) => console.error('Live geometry update failed:', error))
+            .finally(() => {
+                this.liveInFlight[zoneName] = null;
+                if (this.livePending[zoneName]) {
+                    this.streamLiveGeometry(zoneName);
+                }
+            });
+    }
+    
+    async commitLiveGeometry(zoneName) {
+        // Nothing to commit for a plain click without movement
+        if (!this.livePreview || !this.liveDirty[zoneName]) {
+            return;
+        }
+        this.liveDirty[zoneName] = false;
+        
+        // Let the last live update land before committing
+        this.livePending[zoneName] = false;
+        if (this.liveInFlight[zoneName]) {
+            await this.liveInFlight[zoneName];
+        }
+        
+        const zoneId = zoneName === 'zone1' ? 1 : 2;
+        try {
+            await api.streamZoneGeometry(zoneId, this.getZoneGeometry(zoneName), true);
+        } catch (error) {
+            console.error('Geometry commit failed:', error);
+        }
     }
     
     isInsideZone(zone, pos) {